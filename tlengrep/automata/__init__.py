@@ -1,3 +1,7 @@
 from automata.af import AF
 from automata.afd import AFD
 from automata.afnd import AFND
+from automata.tabla import TablaAFD
+from automata.afd_lazy import AFDLazy
+from automata.bitparallel import BitParallelNFA
+from automata.errors import StateLimitExceeded
@@ -33,12 +33,29 @@ class AF(ABC):
         if final:
             self.final_states.add(state)
 
+    def new_state(self, final: bool = False) -> int:
+        """
+        Agrega un estado nuevo al autómata, nombrado con el siguiente entero
+        libre, y lo devuelve.
+        """
+        state = len(self.states)
+        while state in self.states:
+            state += 1
+        self.add_state(state, final)
+        return state
+
     def mark_initial_state(self, state: Hashable):
         """Marca un estado del autómata como inicial."""
         if state not in self.states:
             raise ValueError(f"El estado {state} no pertenece al autómata.")
         self.initial_state = state
 
+    def mark_final_state(self, state: Hashable):
+        """Marca un estado del autómata como final."""
+        if state not in self.states:
+            raise ValueError(f"El estado {state} no pertenece al autómata.")
+        self.final_states.add(state)
+
     def normalize_states(self):
         """
         Normaliza los nombres de los estados según la convención q0, q1, q2, ...
@@ -52,32 +69,16 @@ class AF(ABC):
             if state not in new_names:
                 new_names[state] = f"q{i + 1}"
 
-        # Ordenamos los estados para hacer el renombre sin pisar ninguno
-        ordered_new_names = []
-        while len(new_names) > 0:
-            for old_name, new_name in new_names.items():
-                if old_name == new_name or new_name not in new_names.keys():
-                    ordered_new_names.append([old_name, new_name, False])
-                    del new_names[old_name]
-                    break
-            else:
-                # Detectamos un loop entre las operaciones de renombre
-                # Hay que usar un nombre temporal
-                old_name, new_name = next(iter(new_names.items()))
-                ordered_new_names.append([old_name, new_name, True])
-                del new_names[old_name]
-
-        # Realizamos el renombre
-        for old_name, new_name, use_temp in ordered_new_names:
-            if use_temp:
-                while new_name in self.states:
-                    new_name = f"temp:{new_name}"
-            self._rename_state(old_name, new_name)
-
-        # Eliminamos los nombres temporales
-        for state in self.states:
-            if state.startswith("temp:"):
-                self._rename_state(state, state.split(":")[-1])
+        # Armamos todo de nuevo con los nombres nuevos, en una sola pasada
+        # (renombrar los estados de a uno recorre todas las transiciones cada vez)
+        self.states = set(new_names.values())
+        self.final_states = {new_names[state] for state in self.final_states}
+        if self.initial_state is not None:
+            self.initial_state = new_names[self.initial_state]
+        self.transitions = {
+            new_names[state]: self._rename_targets(transitions, new_names)
+            for state, transitions in self.transitions.items()
+        }
 
         return self
 
@@ -114,6 +115,14 @@ class AF(ABC):
         """Renombra un estado dentro de las transiciones del autómata.""" 
         pass
 
+    @abstractmethod
+    def _rename_targets(self, transitions: dict, new_names: dict) -> dict:
+        """
+        Devuelve las transiciones de un estado (un diccionario símbolo -> destino)
+        con los destinos renombrados según new_names.
+        """
+        pass
+
     @abstractmethod
     def _get_extended_alphabet(self) -> list[str]:
         """Obtiene el alfabeto extendido del autómata (incluyendo símbolos especiales)."""
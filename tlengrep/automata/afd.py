@@ -5,13 +5,27 @@ __all__ = ["AFD"]
 
 
 class AFD(AF):
-    """Autómata finito determinístico."""
+    """
+    Autómata finito determinístico.
+
+    Si classes no es None, el alfabeto del autómata son representantes de
+    clases de símbolos (ver AFND.alphabet_classes), y classes asigna a cada
+    símbolo el representante de su clase.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.classes = None
 
     def accept_string(self, word: str):
         """ Verifica si la cadena Word es aceptada por el autómata """
 
         # q es el estado en el que estamos parades
         q = self.initial_state
+
+        # Traducimos cada símbolo al representante de su clase
+        if self.classes is not None:
+            word = (self.classes.get(a) for a in word)
         
         # Hacemos el match
         for a in word:
@@ -35,6 +49,43 @@ class AFD(AF):
         self.transitions[state1][char] = state2
         self.alphabet.add(char)
 
+    def to_bytes(self) -> "AFD":
+        """
+        Devuelve un AFD equivalente que lee bytes en vez de caracteres: cada
+        carácter se codifica en UTF-8 y los símbolos del nuevo alfabeto son
+        los valores de los bytes (enteros entre 0 y 255).
+        """
+        afd = AFD()
+        for q in self.states:
+            afd.add_state(q, q in self.final_states)
+        afd.mark_initial_state(self.initial_state)
+
+        # Los bytes no se agrupan en clases: cada representante vuelve a
+        # ser todos los caracteres de su clase
+        miembros = {}
+        for a, representante in (self.classes or {}).items():
+            miembros.setdefault(representante, []).append(a)
+
+        # Los caracteres de más de un byte necesitan estados intermedios.
+        # Los compartimos entre caracteres con el mismo prefijo para que el
+        # autómata siga siendo determinístico.
+        intermedios = {}
+        for q in self.states:
+            for representante, p in self.transitions[q].items():
+                for a in miembros.get(representante, [representante]):
+                    codigo = a.encode("utf-8")
+                    origen = q
+                    for i in range(1, len(codigo)):
+                        intermedio = ("utf-8", q, codigo[:i])
+                        if intermedio not in intermedios:
+                            intermedios[intermedio] = True
+                            afd.add_state(intermedio)
+                            afd.add_transition(origen, intermedio, codigo[i - 1])
+                        origen = intermedio
+                    afd.add_transition(origen, p, codigo[-1])
+
+        return afd
+
     def estados_accesibles(self, Q: set, Qv: set) -> set:
         
         # Qv son los estados que ya visité        
@@ -56,9 +107,113 @@ class AFD(AF):
             return U | self.estados_accesibles(U, Qv)
 
 
-    def minimize(self):
+    def minimize(self, algorithm: str = "hopcroft") -> "AFD":
+        """
+        Minimiza el autómata. El algoritmo puede ser "hopcroft" (refinamiento
+        de particiones, O(n·|Σ|·log n)) o "moore" (el algoritmo de la tablita,
+        O(n²·|Σ|)). Ambos devuelven el mismo autómata mínimo.
+        """
+        if algorithm == "hopcroft":
+            return self._minimize_hopcroft()
+        if algorithm == "moore":
+            return self._minimize_moore()
+        raise ValueError(f"Algoritmo de minimización desconocido: {algorithm}.")
+
+    def _minimize_hopcroft(self) -> "AFD":
+        """(Interno) Minimiza el autómata con el algoritmo de Hopcroft."""
+
+        # Trabajamos con estados numerados. Si al autómata le faltan
+        # transiciones, las mandamos a un estado trampa (el último).
+        estados = list(self.states)
+        ids = {q: i for i, q in enumerate(estados)}
+        alphabet = list(self.alphabet)
+        n = len(estados)
+
+        delta = [[n] * len(alphabet) for _ in range(n)]
+        for i, q in enumerate(estados):
+            for j, a in enumerate(alphabet):
+                if a in self.transitions[q]:
+                    delta[i][j] = ids[self.transitions[q][a]]
+        if any(n in fila for fila in delta):
+            delta.append([n] * len(alphabet))
+            n += 1
+
+        # Transiciones inversas: inversa[j][p] = estados que van a p consumiendo alphabet[j]
+        inversa = [[[] for _ in range(n)] for _ in alphabet]
+        for i in range(n):
+            for j in range(len(alphabet)):
+                inversa[j][delta[i][j]].append(i)
+
+        # Partición inicial: finales y no finales
+        finales = {ids[q] for q in self.final_states}
+        bloques = [B for B in [set(finales), set(range(n)) - finales] if B]
+        bloque_de = [0] * n
+        for b, B in enumerate(bloques):
+            for i in B:
+                bloque_de[i] = b
+
+        # Pendientes: pares (bloque, símbolo) con los que todavía hay que refinar.
+        # Alcanza con empezar por el bloque más chico.
+        if len(bloques) == 2:
+            menor = 0 if len(bloques[0]) <= len(bloques[1]) else 1
+            pendientes = {(menor, j) for j in range(len(alphabet))}
+        else:
+            pendientes = set()
+
+        while pendientes:
+            A, j = pendientes.pop()
+
+            # X son los estados que van a A consumiendo alphabet[j]
+            X = set()
+            for p in bloques[A]:
+                X.update(inversa[j][p])
+
+            # Agrupamos X según el bloque de cada estado
+            cortes = {}
+            for i in X:
+                cortes.setdefault(bloque_de[i], set()).add(i)
+
+            for b, Y1 in cortes.items():
+                Y = bloques[b]
+                if len(Y1) == len(Y):
+                    continue
+
+                # Partimos Y: los que van a A (Y1) pasan a un bloque nuevo, y
+                # los que no quedan en Y. Así el corte cuesta O(|Y1|), que es
+                # lo que hace falta para que el total sea O(n·|Σ|·log n).
+                Y.difference_update(Y1)
+                nuevo = len(bloques)
+                bloques.append(Y1)
+                for i in Y1:
+                    bloque_de[i] = nuevo
+
+                for k in range(len(alphabet)):
+                    if (b, k) in pendientes:
+                        pendientes.add((nuevo, k))
+                    else:
+                        pendientes.add((nuevo, k) if len(Y1) <= len(Y) else (b, k))
+
+        # Armamos el AFD mínimo con un estado por bloque. Les ponemos nombres
+        # ya normalizados (el bloque inicial es q0), así nos ahorramos
+        # normalize_states, que renombra los estados de a uno.
+        inicial = bloque_de[ids[self.initial_state]]
+        orden = [inicial] + [b for b in range(len(bloques)) if b != inicial]
+        nombres = {b: f"q{i}" for i, b in enumerate(orden)}
+
+        afd = AFD()
+        for b in orden:
+            afd.add_state(nombres[b], not bloques[b].isdisjoint(finales))
+        afd.mark_initial_state(nombres[inicial])
+        for b in orden:
+            i = next(iter(bloques[b]))
+            for j, a in enumerate(alphabet):
+                afd.add_transition(nombres[b], nombres[bloque_de[delta[i][j]]], a)
+        afd.classes = self.classes
+
+        return afd
 
-        """Minimiza el autómata."""
+    def _minimize_moore(self) -> "AFD":
+        """(Interno) Minimiza el autómata con el algoritmo de Moore (la tablita)."""
 
         # Como no se cómo quitar estados de una automata, prefiero crear uno nuevo
         afd = AFD()
@@ -161,6 +316,7 @@ class AFD(AF):
                     afd.add_transition(claseQ, claseP, a)
 
         afd.normalize_states()
+        afd.classes = self.classes
         
         return afd
 
@@ -173,6 +329,10 @@ class AFD(AF):
                 if self.transitions[state][char] == old_name:
                     self.transitions[state][char] = new_name
 
+    def _rename_targets(self, transitions: dict, new_names: dict) -> dict:
+        """Devuelve las transiciones de un estado con los destinos renombrados."""
+        return {char: new_names[state] for char, state in transitions.items()}
+
     def _get_extended_alphabet(self) -> list[str]:
         """Obtiene el alfabeto extendido del autómata (incluyendo símbolos especiales)."""
         return list(self.alphabet)
@@ -0,0 +1,123 @@
+from itertools import islice
+from typing import Hashable, Optional
+
+from automata.afnd import AFND
+
+__all__ = ["AFDLazy"]
+
+
+class AFDLazy:
+    """
+    AFD que se construye a medida que se lee la entrada (determinización
+    perezosa de un AFND).
+
+    Los estados son conjuntos de estados del AFND, igual que en
+    AFND.determinize, pero una transición sólo se calcula la primera vez que
+    la entrada la necesita. Las transiciones calculadas se guardan en un cache
+    de a lo sumo max_states estados; cuando se llena, se vacía entero y se
+    vuelve a llenar con los estados que se sigan usando.
+
+    Si unanchored es True, el autómata reconoce las cadenas que tienen alguna
+    ocurrencia de la expresión (como si empezara con Σ*).
+    """
+
+    def __init__(self, afnd: AFND, max_states: int = 10000, unanchored: bool = False):
+        if max_states < 1:
+            raise ValueError(f"La cantidad máxima de estados debe ser positiva (recibimos {max_states}).")
+        self.afnd = afnd
+        self.max_states = max_states
+        self.unanchored = unanchored
+        self.flushes = 0
+
+        self._clausuras = afnd.clausuras_lambda()
+        self.initial = self._clausuras[afnd.initial_state]
+
+        self._cache = {}   # _cache[<estado>][<símbolo>] = <estado>
+        self._finales = {} # _finales[<estado>] = <¿es final?>
+
+    def accept_string(self, word: str) -> bool:
+        """Verifica si la cadena word es aceptada por el autómata."""
+        Q = self.initial
+        cache = self._cache
+
+        for a in word:
+            try:
+                Q = cache[Q][a]
+            except KeyError:
+                Q = self._materialize(Q, a)
+                cache = self._cache  # Por si se vació el cache
+            if not Q:
+                return False
+
+        return self._is_final(Q)
+
+    def accept_bytes(self, data: bytes, end: Optional[int] = None) -> bool:
+        """Verifica si los bytes data[:end] son aceptados por el autómata."""
+        return self.accept_string(data if end is None else islice(data, end))
+
+    def search_string(self, word: str) -> Optional[int]:
+        """
+        Devuelve la posición donde termina la primera ocurrencia aceptada por
+        el autómata dentro de word, o None si no hay ninguna.
+        Sólo tiene sentido si el autómata es unanchored.
+        """
+        Q = self.initial
+        if self._is_final(Q):
+            return 0
+
+        cache = self._cache
+        for i, a in enumerate(word):
+            try:
+                Q = cache[Q][a]
+            except KeyError:
+                Q = self._materialize(Q, a)
+                cache = self._cache
+            if self._is_final(Q):
+                return i + 1
+
+        return None
+
+    def search_bytes(self, data: bytes, end: Optional[int] = None) -> Optional[int]:
+        """Como search_string, pero sobre los bytes data[:end]."""
+        return self.search_string(data if end is None else islice(data, end))
+
+    def size(self) -> int:
+        """Devuelve la cantidad de estados materializados en el cache."""
+        return len(self._cache)
+
+    def _materialize(self, Q: frozenset, a: Hashable) -> frozenset:
+        """(Interno) Calcula la transición desde Q consumiendo a, y la guarda en el cache."""
+
+        if Q not in self._cache:
+            # Si el cache está lleno, lo vaciamos
+            if len(self._cache) >= self.max_states:
+                self._cache = {}
+                self._finales = {}
+                self.flushes += 1
+            self._cache[Q] = {}
+
+        # Formo U como el conjunto de estados visitables desde Q consumiendo 'a'
+        # (junto con su clausura λ)
+        transitions = self.afnd.transitions
+        clausuras = self._clausuras
+        U = set()
+        for q in Q:
+            for p in transitions[q].get(a, ()):
+                U |= clausuras[p]
+
+        # En modo unanchored, en cada paso puede empezar una nueva ocurrencia
+        if self.unanchored:
+            U |= self.initial
+
+        U = frozenset(U)
+        self._cache[Q][a] = U
+        return U
+
+    def _is_final(self, Q: frozenset) -> bool:
+        """(Interno) Indica si el estado Q es final."""
+        try:
+            return self._finales[Q]
+        except KeyError:
+            final = not self.afnd.final_states.isdisjoint(Q)
+            self._finales[Q] = final
+            return final
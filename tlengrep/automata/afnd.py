@@ -1,8 +1,10 @@
 from enum import Enum
-from typing import Hashable, Union
+from itertools import islice
+from typing import Hashable, Optional, Union
 
 from automata.af import AF
 from automata.afd import AFD
+from automata.errors import StateLimitExceeded
 
 
 __all__ = ["AFND"]
@@ -15,6 +17,16 @@ class SpecialSymbol(Enum):
 class AFND(AF):
     """Autómata finito no determinístico (con transiciones lambda)."""
 
+    def __init__(self):
+        super().__init__()
+        self._clausuras = None
+        self._simulacion = None
+
+    def add_state(self, state: Hashable, final: bool = False):
+        """Agrega un estado al autómata."""
+        super().add_state(state, final)
+        self._clausuras = None
+
     def add_transition(self, state1: Hashable, state2: Hashable, char: Union[str, SpecialSymbol]):
         """Agrega una transición al autómata."""
         if state1 not in self.states:
@@ -26,78 +38,324 @@ class AFND(AF):
         self.transitions[state1][char].add(state2)
         if char is not SpecialSymbol.Lambda:
             self.alphabet.add(char)
+        self._clausuras = None
 
-    # Obs: Quizás se está formando un ciclo de λ
-    def clausura_lambda(self, Q: set, Qv: set) -> set:
+    def accept_string(self, word: str) -> bool:
+        """
+        Verifica si la cadena word es aceptada por el autómata, simulándolo
+        sin determinizarlo (ver _tabla_simulacion). Cada símbolo cuesta a lo
+        sumo una consulta por estado activo, así que tarda O(n·m) aunque el
+        AFD equivalente tenga una cantidad exponencial de estados.
+        """
+        inicial, finales, sucesores = self._tabla_simulacion()
+        D = inicial
+
+        for a in word:
+            fila = sucesores.get(a)
+            if fila is None:
+                return False
+            U = 0
+            while D:
+                menor = D & -D # El bit más bajo de D
+                U |= fila[menor.bit_length() - 1]
+                D ^= menor
+            D = U
+            if not D:
+                return False
+
+        return D & finales != 0
+
+    def accept_bytes(self, data: bytes, end: Optional[int] = None) -> bool:
+        """Verifica si los bytes data[:end] son aceptados (el autómata tiene que leer bytes, ver to_bytes)."""
+        return self.accept_string(data if end is None else islice(data, end))
+
+    def search_string(self, word: str) -> Optional[int]:
+        """
+        Devuelve la posición donde termina la primera ocurrencia aceptada por
+        el autómata dentro de word, o None si no hay ninguna. Como en cada
+        paso de la simulación puede empezar una nueva ocurrencia, no hace
+        falta armar el autómata de Σ*·L (ver unanchored).
+        """
+        inicial, finales, sucesores = self._tabla_simulacion()
+        D = inicial
+        if D & finales:
+            return 0
+
+        for i, a in enumerate(word):
+            fila = sucesores.get(a)
+            U = 0
+            if fila is not None:
+                while D:
+                    menor = D & -D
+                    U |= fila[menor.bit_length() - 1]
+                    D ^= menor
+            D = U | inicial
+            if D & finales:
+                return i + 1
+
+        return None
+
+    def search_bytes(self, data: bytes, end: Optional[int] = None) -> Optional[int]:
+        """Como search_string, pero sobre los bytes data[:end]."""
+        return self.search_string(data if end is None else islice(data, end))
+
+    def _tabla_simulacion(self) -> tuple[int, int, dict]:
+        """
+        (Interno) Devuelve lo que necesita la simulación del autómata, donde
+        cada conjunto de estados es un entero con un bit por estado:
+        - La clausura λ del estado inicial.
+        - Los estados finales.
+        - sucesores[<símbolo>][i]: los estados alcanzables desde el estado
+          del bit i consumiendo el símbolo, junto con su clausura λ.
+        Se calcula una sola vez, y se recalcula si cambian las clausuras.
+        """
+        clausuras = self.clausuras_lambda()
+        if self._simulacion is not None and self._simulacion[0] is clausuras:
+            return self._simulacion[1]
+
+        estados = list(self.states)
+        bit = {q: 1 << i for i, q in enumerate(estados)}
+
+        def mascara(Q):
+            m = 0
+            for q in Q:
+                m |= bit[q]
+            return m
+
+        cierres = {q: mascara(clausuras[q]) for q in estados}
+        sucesores = {}
+        for i, q in enumerate(estados):
+            for a, P in self.transitions[q].items():
+                if a == "λ" or a is SpecialSymbol.Lambda:
+                    continue
+                fila = sucesores.setdefault(a, [0] * len(estados))
+                for p in P:
+                    fila[i] |= cierres[p]
+
+        tabla = (cierres[self.initial_state], mascara(self.final_states), sucesores)
+        self._simulacion = (clausuras, tabla)
+        return tabla
+
+    def to_bytes(self) -> "AFND":
+        """
+        Devuelve un AFND equivalente que lee bytes en vez de caracteres: cada
+        carácter se codifica en UTF-8 y los símbolos del nuevo alfabeto son
+        los valores de los bytes (enteros entre 0 y 255).
+        """
+        afnd = AFND()
+        for q in self.states:
+            afnd.add_state(q, q in self.final_states)
+        afnd.mark_initial_state(self.initial_state)
+
+        for q in self.states:
+            for a, P in self.transitions[q].items():
+                if a == "λ" or a is SpecialSymbol.Lambda:
+                    for p in P:
+                        afnd.add_transition(q, p, a)
+                    continue
+
+                # Los caracteres de más de un byte necesitan estados intermedios
+                codigo = a.encode("utf-8")
+                origen = q
+                for i in range(1, len(codigo)):
+                    intermedio = ("utf-8", q, codigo[:i])
+                    if intermedio not in afnd.states:
+                        afnd.add_state(intermedio)
+                        afnd.add_transition(origen, intermedio, codigo[i - 1])
+                    origen = intermedio
+                for p in P:
+                    afnd.add_transition(origen, p, codigo[-1])
+
+        return afnd
+
+    def unanchored(self) -> "AFND":
+        """
+        Devuelve un AFND que acepta las cadenas que terminan con una cadena
+        aceptada por este autómata (es decir, el lenguaje Σ*·L). Sirve para
+        buscar ocurrencias en cualquier posición con una sola pasada.
+        """
+        afnd = AFND()
+        for q in self.states:
+            afnd.add_state(q, q in self.final_states)
+        for q in self.states:
+            for a, P in self.transitions[q].items():
+                for p in P:
+                    afnd.add_transition(q, p, a)
 
-        # Q es el conjunto de estados al que le aplicamos la Clausura λ
-        # Qv son los estados ya visitados, no los quiero volver a visitar en futuras recursiones
-        # (Para evitar entrar en un ciclo de transiciones λ)
+        # El nuevo estado inicial consume cualquier prefijo antes de empezar
+        inicio = afnd.new_state()
+        for a in self.alphabet - {"λ"}:
+            afnd.add_transition(inicio, inicio, a)
+        afnd.add_transition(inicio, self.initial_state, "λ")
+        afnd.mark_initial_state(inicio)
 
-        Qv = Qv | Q
+        return afnd
+
+    def alphabet_classes(self) -> dict[Hashable, Hashable]:
+        """
+        Agrupa los símbolos que el autómata no distingue: dos símbolos están
+        en la misma clase si desde cada estado llevan a los mismos estados
+        (por ejemplo, todos los caracteres de un [a-z]). Devuelve un
+        diccionario que asigna a cada símbolo el representante de su clase.
+        """
+
+        # La firma de un símbolo son todas las transiciones que lo consumen
+        firmas = {a: [] for a in self.alphabet - {"λ"}}
+        for q in self.states:
+            for a, P in self.transitions[q].items():
+                if a in firmas:
+                    firmas[a].append((q, frozenset(P)))
+
+        representantes = {} # representantes[<firma>] = <representante de la clase>
+        clases = {}
+        for a in sorted(firmas, key=str):
+            clases[a] = representantes.setdefault(tuple(firmas[a]), a)
+        return clases
+
+    def clausura_lambda(self, Q: set, Qv: set) -> set:
+        """
+        Devuelve los estados alcanzables desde Q usando sólo transiciones λ,
+        sin incluir a los estados de Q ni a los de Qv.
+        """
+        clausuras = self.clausuras_lambda()
         U = set()
-                
-        if len(Q) == 0:
+        for q in Q:
+            U |= clausuras[q]
+        return U - Q - Qv
+
+    def clausuras_lambda(self) -> dict[Hashable, frozenset]:
+        """
+        Devuelve un diccionario con la clausura λ de cada estado (incluyendo
+        al propio estado). Se calcula una sola vez y se reusa hasta que se
+        modifique el autómata.
+
+        Obs: si se modifican las transiciones a mano (sin add_transition),
+        hay que descartar las clausuras con self._clausuras = None.
+        """
+        if self._clausuras is None:
+            self._clausuras = self._calcular_clausuras()
+        return self._clausuras
+
+    def _calcular_clausuras(self) -> dict[Hashable, frozenset]:
+        """
+        (Interno) Calcula la clausura λ de todos los estados en tiempo lineal.
+
+        Usamos el algoritmo de Tarjan (iterativo, para no depender del límite
+        de recursión) sobre el grafo de transiciones λ. Todos los estados de
+        una componente fuertemente conexa (por ejemplo, un ciclo de λ como los
+        que arma Star.to_afnd) tienen la misma clausura, así que la calculamos
+        una vez por componente y la compartimos.
+        """
+
+        def sucesores(q):
+            U = self.transitions[q].get("λ", set())
+            if SpecialSymbol.Lambda in self.transitions[q]:
+                U = U | self.transitions[q][SpecialSymbol.Lambda]
             return U
-        else:
-            # Formo U como el conjunto de estados visitables desde Q con una transición λ
-            for q in Q:
-                if "λ" in self.transitions[q]:
-                    U = U | self.transitions[q]["λ"]
-            # A U le quito aquellos estados que no quiero volver a visitar
-            U = U - Qv
-            return U | self.clausura_lambda(U, Qv)
 
-    def determinize(self) -> AFD:
-        """Determiniza el autómata."""
+        clausuras = {}
+        indice = {}     # Orden en el que visitamos cada estado
+        bajo = {}       # Menor índice alcanzable desde el estado
+        pila = []       # Estados de las componentes todavía abiertas
+        en_pila = set()
+
+        for raiz in self.states:
+            if raiz in indice:
+                continue
+
+            # Cada elemento de dfs es un estado y un iterador de sus sucesores
+            indice[raiz] = bajo[raiz] = len(indice)
+            pila.append(raiz)
+            en_pila.add(raiz)
+            dfs = [(raiz, iter(sucesores(raiz)))]
+
+            while dfs:
+                q, hijos = dfs[-1]
+                for p in hijos:
+                    if p not in indice:
+                        indice[p] = bajo[p] = len(indice)
+                        pila.append(p)
+                        en_pila.add(p)
+                        dfs.append((p, iter(sucesores(p))))
+                        break
+                    if p in en_pila:
+                        bajo[q] = min(bajo[q], indice[p])
+                else:
+                    # Terminamos de recorrer los sucesores de q
+                    dfs.pop()
+                    if dfs:
+                        padre = dfs[-1][0]
+                        bajo[padre] = min(bajo[padre], bajo[q])
+
+                    if bajo[q] == indice[q]:
+                        # q es la raíz de una componente: la sacamos de la pila.
+                        # Tarjan cierra las componentes después de las que son
+                        # alcanzables desde ellas, así que esas clausuras ya están.
+                        componente = set()
+                        while True:
+                            p = pila.pop()
+                            en_pila.discard(p)
+                            componente.add(p)
+                            if p == q:
+                                break
+                        clausura = set(componente)
+                        for p in componente:
+                            for r in sucesores(p):
+                                if r not in componente:
+                                    clausura |= clausuras[r]
+                        clausura = frozenset(clausura)
+                        for p in componente:
+                            clausuras[p] = clausura
+
+        return clausuras
+
+    def determinize(self, max_states: Optional[int] = None) -> AFD:
+        """
+        Determiniza el autómata. Si se indica max_states y el AFD necesita
+        más estados, se deja de construir y se lanza StateLimitExceeded (la
+        construcción de subconjuntos puede tener una cantidad exponencial de
+        estados).
+        """
 
         # Creamos el autómata
         afd = AFD()
         
+        # Clausuras λ de todos los estados, calculadas una sola vez
+        clausuras = self.clausuras_lambda()
+
+        # Determinizamos usando un solo símbolo por clase (ver alphabet_classes)
+        clases = self.alphabet_classes()
+        alphabet = set(clases.values())
+
         # Estado inicial
-        qi = self.clausura_lambda({self.initial_state}, set())
-        qi.add(self.initial_state)
-        qi = frozenset(qi)
+        qi = clausuras[self.initial_state]
 
         Estados = [qi]      # Estados del afd (visitados y sin visitar)
-        Visitados = set()   # Estados del afd (visitados)
+        Vistos = {qi}       # Los mismos estados, en un set para buscarlos rápido
 
-        # Esta es la mejor forma que encontramos de hacer un dict adentro de otro dict
-        # (que vergüenzaaa!!!)
-        delta      = {}  # Función de transición delta
-        mini_delta = {}  # Variable auxiliar para delta
+        delta = {}  # Función de transición delta: delta[Q][a] = U
 
         for Q in Estados:
 
-            if Q not in Visitados:
-                
-                Visitados.add(Q)
+            delta[Q] = {}
 
-                for a in self.alphabet - set("λ"): # Por cada símbolo del alfabeto
+            for a in alphabet: # Por cada símbolo del alfabeto
 
-                    # Formo U como el conjunto de estados visitables desde Q consumiendo 'a'
-                    U = set()
-                    for q in Q:
-                        if a in self.transitions[q]:
-                            U = U | self.transitions[q][a]
+                # Formo U como el conjunto de estados visitables desde Q consumiendo 'a'
+                # (junto con su clausura λ)
+                U = set()
+                for q in Q:
+                    for p in self.transitions[q].get(a, ()):
+                        U |= clausuras[p]
+                U = frozenset(U)
 
-                    U = U | self.clausura_lambda(U, set())
+                delta[Q][a] = U
 
-                    # Formo delta[Q]
-                    # Las siguientes lineas son para hacer: 
-                    # delta[Q][a] = frozenset(U)
-                    
-                    # aaaa que espanto que vergüenzaaa
-                    if Q not in delta.keys():
-                        mini_delta = {}
-                    else:
-                        mini_delta = delta[Q]
-                    
-                    mini_delta[a] = frozenset(U)
-                    delta[Q] = mini_delta
-
-                    if U not in Estados:
-                        Estados.append(frozenset(U))
+                if U not in Vistos:
+                    Vistos.add(U)
+                    Estados.append(U)
+                    if max_states is not None and len(Estados) > max_states:
+                        raise StateLimitExceeded(max_states)
 
         # Agregamos los estados
         for Q in Estados:
@@ -110,17 +368,19 @@ class AFND(AF):
 
         # Agregamos las transiciones
         for Q in Estados:
-            for a in self.alphabet:
-                if delta != {} and a in delta[Q]:
-                    afd.add_transition(Q, delta[Q][a], a)
+            for a, U in delta[Q].items():
+                afd.add_transition(Q, U, a)
 
         afd.normalize_states()
+        if len(alphabet) < len(clases):
+            afd.classes = clases
         return afd
             
      
 
     def _rename_state_in_transitions(self, old_name: Hashable, new_name: Hashable):
         """Renombra un estado dentro de las transiciones del autómata."""
+        self._clausuras = None
         self.transitions[new_name] = self.transitions[old_name]
         del self.transitions[old_name]
         for state in self.transitions:
@@ -129,6 +389,11 @@ class AFND(AF):
                     self.transitions[state][char].remove(old_name)
                     self.transitions[state][char].add(new_name)
 
+    def _rename_targets(self, transitions: dict, new_names: dict) -> dict:
+        """Devuelve las transiciones de un estado con los destinos renombrados."""
+        self._clausuras = None
+        return {char: {new_names[state] for state in states} for char, states in transitions.items()}
+
     def _get_extended_alphabet(self) -> list[str]:
         """Obtiene el alfabeto extendido del autómata (incluyendo símbolos especiales)."""
         return list(self.alphabet) + [SpecialSymbol.Lambda]
@@ -138,7 +403,7 @@ class AFND(AF):
         transitions = {}
         for char in self._get_extended_alphabet():
             if char in self.transitions[state]:
-                transitions[char] = ",".join(self.transitions[state][char])
+                transitions[char] = ",".join(map(str, self.transitions[state][char]))
             else:
                 transitions[char] = "-"
         return transitions
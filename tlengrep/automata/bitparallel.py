@@ -0,0 +1,152 @@
+from typing import Optional
+
+from automata.afnd import AFND, SpecialSymbol
+
+__all__ = ["BitParallelNFA", "MAX_STATES"]
+
+# Cantidad máxima de estados (las posiciones de Glushkov más el inicial),
+# para que los conjuntos de estados entren en una palabra de 64 bits
+MAX_STATES = 64
+
+
+class BitParallelNFA:
+    """
+    Simulación bit-paralela de un AFND sin transiciones λ, como el de
+    Glushkov (ver RegEx.to_afnd), sin determinizarlo.
+
+    El conjunto de estados activos es un entero con un bit por estado. Como
+    en el autómata de Glushkov todas las transiciones que entran a un estado
+    consumen los mismos caracteres, un paso de la simulación es:
+
+        D' = follow(D) & mascaras[a]
+
+    donde mascaras[a] son los estados a los que se entra consumiendo a, y
+    follow(D) son los estados alcanzables desde D con una transición. Para
+    calcular follow(D) sin recorrer los bits de a uno, se precalcula una
+    tabla por cada byte del entero: tablas[k][v] es follow de los estados
+    cuyos bits, entre el 8k y el 8k+7, forman v.
+
+    Así, cada carácter cuesta a lo sumo 8 consultas a las tablas, sin
+    importar cuán grande sea el AFD equivalente.
+
+    Si unanchored es True, se reconocen las cadenas que tienen alguna
+    ocurrencia de la expresión (como si empezara con Σ*).
+    """
+
+    def __init__(self, afnd: AFND, unanchored: bool = False):
+        if len(afnd.states) > MAX_STATES:
+            raise ValueError(f"El autómata tiene {len(afnd.states)} estados (el máximo es {MAX_STATES}).")
+        self.unanchored = unanchored
+        self.n_states = len(afnd.states)
+
+        # Numeramos los estados, dejando el inicial primero
+        estados = [afnd.initial_state] + sorted(afnd.states - {afnd.initial_state}, key=str)
+        bit = {q: 1 << i for i, q in enumerate(estados)}
+
+        self.initial = bit[afnd.initial_state]
+        self.finals = 0
+        for q in afnd.final_states:
+            self.finals |= bit[q]
+
+        follow = [0] * len(estados)
+        self._masks = {} # _masks[<carácter>] = <estados a los que se entra consumiendo el carácter>
+        entradas = {}    # entradas[<estado>] = <caracteres con los que se entra al estado>
+        for i, q in enumerate(estados):
+            for a, P in afnd.transitions[q].items():
+                if a == "λ" or a is SpecialSymbol.Lambda:
+                    raise ValueError("El autómata no puede tener transiciones λ.")
+                for p in P:
+                    follow[i] |= bit[p]
+                    self._masks[a] = self._masks.get(a, 0) | bit[p]
+                    entradas.setdefault(p, set()).add(a)
+
+        # La simulación sólo es correcta si desde cada estado se entra a p
+        # con todos los caracteres de p (como en el autómata de Glushkov)
+        for q in estados:
+            destinos = {}
+            for a, P in afnd.transitions[q].items():
+                for p in P:
+                    destinos.setdefault(p, set()).add(a)
+            for p, caracteres in destinos.items():
+                if caracteres != entradas[p]:
+                    raise ValueError(f"Al estado {p} se entra con caracteres distintos según el origen.")
+
+        # Tablas de follow, por cada byte del conjunto de estados
+        self._tablas = []
+        for k in range(0, len(estados), 8):
+            tabla = [0] * 256
+            for v in range(1, 256):
+                menor = (v & -v).bit_length() - 1 # El bit más bajo de v
+                tabla[v] = tabla[v & (v - 1)] | (follow[k + menor] if k + menor < len(estados) else 0)
+            self._tablas.append(tabla)
+
+    def accept_string(self, word: str) -> bool:
+        """Verifica si la cadena word es aceptada por el autómata."""
+        tablas = self._tablas
+        masks = self._masks
+        D = self.initial
+
+        for a in word:
+            F = 0
+            k = 0
+            while D:
+                F |= tablas[k][D & 0xFF]
+                D >>= 8
+                k += 1
+            D = F & masks.get(a, 0)
+            if not D:
+                return False
+
+        return D & self.finals != 0
+
+    def accept_bytes(self, data: bytes, end: Optional[int] = None) -> bool:
+        """
+        Verifica si los bytes data[:end] son aceptados. Las máscaras son por
+        carácter, así que los bytes se decodifican.
+        """
+        return self.accept_string(self._decode(data, end))
+
+    def search_string(self, word: str) -> Optional[int]:
+        """
+        Devuelve la posición donde termina la primera ocurrencia aceptada por
+        el autómata dentro de word, o None si no hay ninguna.
+        Sólo tiene sentido si el autómata es unanchored.
+        """
+        tablas = self._tablas
+        masks = self._masks
+        finals = self.finals
+        inicial = self.initial
+        D = inicial
+        if D & finals:
+            return 0
+
+        for i, a in enumerate(word):
+            F = 0
+            k = 0
+            while D:
+                F |= tablas[k][D & 0xFF]
+                D >>= 8
+                k += 1
+            # En cada paso puede empezar una nueva ocurrencia
+            D = F & masks.get(a, 0) | inicial
+            if D & finals:
+                return i + 1
+
+        return None
+
+    def search_bytes(self, data: bytes, end: Optional[int] = None) -> Optional[int]:
+        """Como search_string, pero sobre los bytes data[:end] (la posición se cuenta en bytes)."""
+        word = self._decode(data, end)
+        fin = self.search_string(word)
+        if fin is None:
+            return None
+        return len(word[:fin].encode("utf-8", "surrogateescape"))
+
+    def size(self) -> int:
+        """Devuelve la cantidad de estados del autómata."""
+        return self.n_states
+
+    @staticmethod
+    def _decode(data: bytes, end: Optional[int]) -> str:
+        """(Interno) Decodifica data[:end] (los bytes inválidos no matchean con ningún carácter)."""
+        return bytes(data if end is None else data[:end]).decode("utf-8", "surrogateescape")
@@ -0,0 +1,9 @@
+__all__ = ["StateLimitExceeded"]
+
+
+class StateLimitExceeded(Exception):
+    """La construcción de un autómata superó la cantidad máxima de estados permitida."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"El autómata supera el máximo de {limit} estados.")
+        self.limit = limit
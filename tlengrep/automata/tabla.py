@@ -0,0 +1,240 @@
+from array import array
+from itertools import islice
+from typing import Optional
+
+from automata.afd import AFD
+
+__all__ = ["TablaAFD", "DEAD", "ACCEPT"]
+
+# Centinelas de la tabla (siempre negativos, así alcanza una comparación para detectarlos):
+DEAD = -1   # Estado muerto: una vez que lo alcanzamos, la cadena se rechaza
+ACCEPT = -2 # Estado universal: una vez que lo alcanzamos, la cadena se acepta
+
+
+class TablaAFD:
+    """
+    Representación compacta de un AFD, pensada para matchear rápido.
+
+    Los estados se renumeran con enteros (el inicial es el 0) y los caracteres
+    se agrupan en clases: dos caracteres están en la misma clase si tienen las
+    mismas transiciones desde todos los estados. La clase 0 queda reservada
+    para los caracteres que no están en el alfabeto, que van siempre a DEAD.
+
+    Los estados desde los que ya no se puede aceptar (como el estado trampa
+    que deja minimize) no se guardan: las transiciones hacia ellos valen
+    DEAD. Del mismo modo, los estados desde los que se acepta cualquier
+    continuación valen ACCEPT. Así, en líneas largas, el matcheo termina
+    apenas se decide el resultado.
+
+    Si el AFD lee bytes (ver AFD.to_bytes), las clases se guardan además en
+    una lista indexada por byte, y se puede matchear con accept_bytes.
+
+    Las transiciones se guardan en un array plano de n_estados * n_clases
+    enteros. Para ahorrarnos una multiplicación por carácter, cada estado se
+    representa por el offset de su fila en la tabla (id * n_clases).
+
+    Con search=True, la tabla sirve para buscar ocurrencias (ver search_string)
+    y el AFD tiene que ser el de Σ*·L (ver AFND.unanchored): los estados
+    finales valen ACCEPT, y los caracteres desconocidos vuelven al estado
+    inicial en vez de ir a DEAD.
+    """
+
+    def __init__(self, afd: AFD, search: bool = False):
+
+        # Clasificamos los estados que no hace falta simular:
+        # - muertos: desde ellos no se llega a ningún estado final.
+        # - universales: desde ellos toda cadena termina en un estado final.
+        # Las transiciones hacia ellos se reemplazan por DEAD y ACCEPT, así el
+        # matcheo termina apenas se entra en uno.
+        byte_mode = all(isinstance(a, int) for a in afd.alphabet)
+        muertos = self._muertos(afd)
+        if search:
+            # Al buscar, alcanza con llegar a un estado final
+            universales = set(afd.final_states)
+        else:
+            universales = self._universales(afd, total=byte_mode and len(afd.alphabet) == 256)
+        self.search = search
+
+        # Renumeramos los estados que quedan, dejando el inicial primero
+        vivos = afd.states - muertos - universales
+        estados = sorted(vivos - {afd.initial_state}, key=str)
+        if afd.initial_state in vivos:
+            estados.insert(0, afd.initial_state)
+        ids = {q: i for i, q in enumerate(estados)}
+
+        def destino(p):
+            if p in muertos:
+                return DEAD
+            if p in universales:
+                return ACCEPT
+            return ids[p]
+
+        # Agrupamos los caracteres según su columna en la tabla de transiciones
+        columnas = {}
+        self.classes = {}
+        for a in sorted(afd.alphabet):
+            columna = tuple(
+                destino(afd.transitions[q][a]) if a in afd.transitions[q] else DEAD
+                for q in estados
+            )
+            if columna not in columnas:
+                columnas[columna] = len(columnas) + 1
+            self.classes[a] = columnas[columna]
+
+        # Si el AFD agrupa símbolos en clases, cada símbolo usa la columna de su representante
+        if afd.classes is not None:
+            self.classes = {a: self.classes[representante] for a, representante in afd.classes.items()}
+
+        self.n_states = len(estados)
+        self.n_classes = len(columnas) + 1
+
+        # Armamos la tabla. La columna de la clase 0 queda toda en DEAD
+        k = self.n_classes
+        self.table = array("i", [DEAD]) * (self.n_states * k)
+        for columna, clase in columnas.items():
+            for i, p in enumerate(columna):
+                self.table[i * k + clase] = p * k if p >= 0 else p
+
+        # El estado inicial también puede ser muerto o universal
+        self.initial = destino(afd.initial_state)
+        if self.initial >= 0:
+            self.initial *= k
+        self.finals = frozenset(ids[q] * k for q in afd.final_states & vivos)
+
+        # Al buscar, un carácter desconocido descarta las ocurrencias empezadas
+        if search:
+            for i in range(self.n_states):
+                self.table[i * k] = self.initial
+
+        # Clase de cada byte, para el modo bytes
+        self.byte_classes = None
+        if byte_mode:
+            self.byte_classes = [self.classes.get(b, 0) for b in range(256)]
+
+    @staticmethod
+    def _muertos(afd: AFD) -> set:
+        """(Interno) Devuelve los estados desde los que no se alcanza ningún estado final."""
+
+        # Recorremos las transiciones al revés desde los estados finales
+        inversa = {q: set() for q in afd.states}
+        for q in afd.states:
+            for p in afd.transitions[q].values():
+                inversa[p].add(q)
+
+        vivos = set(afd.final_states)
+        pendientes = list(afd.final_states)
+        while pendientes:
+            p = pendientes.pop()
+            for q in inversa[p]:
+                if q not in vivos:
+                    vivos.add(q)
+                    pendientes.append(q)
+
+        return afd.states - vivos
+
+    @staticmethod
+    def _universales(afd: AFD, total: bool) -> set:
+        """
+        (Interno) Devuelve los estados desde los que toda cadena lleva a un
+        estado final. Si el alfabeto no es total (hay símbolos que el autómata
+        no conoce, y que van a DEAD), no hay ninguno.
+        """
+        if not total:
+            return set()
+
+        # Partimos de los finales completos y vamos sacando los que pueden
+        # salir del conjunto, hasta que no cambie
+        universales = {q for q in afd.final_states if len(afd.transitions[q]) == len(afd.alphabet)}
+        cambio = True
+        while cambio:
+            cambio = False
+            for q in list(universales):
+                if any(p not in universales for p in afd.transitions[q].values()):
+                    universales.discard(q)
+                    cambio = True
+
+        return universales
+
+    def accept_string(self, word: str) -> bool:
+        """Verifica si la cadena word es aceptada por el autómata."""
+        table = self.table
+        clase = self.classes.get
+        q = self.initial
+        if q < 0:
+            return q == ACCEPT
+
+        for a in word:
+            q = table[q + clase(a, 0)]
+            if q < 0:
+                return q == ACCEPT
+
+        return q in self.finals
+
+    def accept_bytes(self, data: bytes, end: Optional[int] = None) -> bool:
+        """
+        Verifica si los bytes data[:end] son aceptados por el autómata.
+        Recibir end en vez de un slice evita copiar la línea (por ejemplo,
+        para ignorar el salto de línea final).
+        """
+        if self.byte_classes is None:
+            raise ValueError("El autómata no lee bytes (ver AFD.to_bytes).")
+
+        table = self.table
+        clase = self.byte_classes
+        q = self.initial
+        if q < 0:
+            return q == ACCEPT
+
+        for b in (data if end is None else islice(data, end)):
+            q = table[q + clase[b]]
+            if q < 0:
+                return q == ACCEPT
+
+        return q in self.finals
+
+    def search_string(self, word: str) -> Optional[int]:
+        """
+        Devuelve la posición donde termina la primera ocurrencia de la
+        expresión dentro de word (la que termina antes), o None si no hay
+        ninguna. La tabla tiene que estar armada con search=True.
+        """
+        if not self.search:
+            raise ValueError("La tabla no sirve para buscar (ver TablaAFD(afd, search=True)).")
+
+        table = self.table
+        clase = self.classes.get
+        q = self.initial
+        if q < 0:
+            return 0 if q == ACCEPT else None
+
+        for i, a in enumerate(word):
+            q = table[q + clase(a, 0)]
+            if q < 0:
+                return i + 1 if q == ACCEPT else None
+
+        return None
+
+    def search_bytes(self, data: bytes, end: Optional[int] = None) -> Optional[int]:
+        """
+        Como search_string, pero sobre los bytes data[:end]. La posición que
+        se devuelve se cuenta en bytes.
+        """
+        if not self.search or self.byte_classes is None:
+            raise ValueError("La tabla no sirve para buscar bytes (ver AFD.to_bytes y TablaAFD(afd, search=True)).")
+
+        table = self.table
+        clase = self.byte_classes
+        q = self.initial
+        if q < 0:
+            return 0 if q == ACCEPT else None
+
+        for i, b in enumerate(data if end is None else islice(data, end)):
+            q = table[q + clase[b]]
+            if q < 0:
+                return i + 1 if q == ACCEPT else None
+
+        return None
+
+    def size(self) -> int:
+        """Devuelve la cantidad de estados guardados en la tabla (sin contar muertos ni universales)."""
+        return self.n_states
@@ -1,10 +1,14 @@
 import ply.yacc as yacc
-from regex import RegEx, Empty, Lambda, Char, Union, Concat, Star, Plus
+from regex import RegEx, Lambda, Char
+from regex.simplify import char_class, union, concat, star, plus, optional, repeat
 from parse_regex.lexer import tokens
 from parse_regex.errors import *
 
 # Todas las producciones producen RegEx
-# Salvo por SYMB, que produce chr
+# Salvo por SYMB, que produce chr, y F, que produce un set de chr
+
+# Las RegEx se arman con los constructores de regex.simplify, que van
+# simplificando la expresión (por ejemplo, aplanan las uniones y sacan los λ)
 
 # La gramática:
 # P    -> S | lambda
@@ -19,19 +23,9 @@ from parse_regex.errors import *
 
 #---(Funciones auxiliares)---
 
-# Devuelve S{N}
-def Power(S, N) -> RegEx:
-    regex = Lambda()
-    for i in range(0, N):
-        regex = Concat(regex, S)
-    return regex
-
-# Devuelve la unión de [N-M]
-def UnionRange(N,M) -> RegEx:
-    regex = Empty()
-    for c in range(ord(N), ord(M)+1):
-        regex = Union(regex, Char(chr(c)))
-    return regex
+# Devuelve los caracteres de [N-M]
+def CharRange(N,M) -> set:
+    return {chr(c) for c in range(ord(N), ord(M)+1)}
 
 
 #---(Definición de las producciones)---
@@ -53,7 +47,7 @@ def p_LAMBDA(p) -> RegEx:
 
 def p_union(p) -> RegEx:
     'S : R OR S'
-    p[0] = Union(p[1], p[3])
+    p[0] = union(p[1], p[3])
 
 def p_S_R(p) -> RegEx:
     'S : R'
@@ -65,7 +59,7 @@ def p_S_R(p) -> RegEx:
 
 def p_concat(p) -> RegEx:
     'R : T R'
-    p[0] = Concat(p[1], p[2])
+    p[0] = concat(p[1], p[2])
 
 def p_R_T(p) -> RegEx:
     'R : T'
@@ -78,24 +72,24 @@ def p_R_T(p) -> RegEx:
 # K*
 def p_STAR(p) -> RegEx:
     'T : K STAR'
-    p[0] = Star(p[1])
+    p[0] = star(p[1])
 
 # K+
 def p_PLUS(p) -> RegEx:
     'T : K PLUS'
-    p[0] = Plus(p[1])
+    p[0] = plus(p[1])
 
 # K?
 def p_OPTIONAL(p) -> RegEx:
     'T : K OPTIONAL'
-    p[0] = Union(p[1], Lambda())
+    p[0] = optional(p[1])
 
 # K{N}
 def p_POWER(p) -> RegEx:
     'T : K POWER'
     # POWER es un string: {n}, dónde n es un número
     n = int(p[2][1:-1])
-    p[0] = Power(p[1], n)
+    p[0] = repeat(p[1], n, n)
 
 # K{N,M}
 def p_POWER_RANGE(p) -> RegEx:
@@ -111,10 +105,8 @@ def p_POWER_RANGE(p) -> RegEx:
     if M < N: # ¿El rango es inválido?
         raise SyntaxError
 
-    regex = Empty()
-    for i in range (N, M+1):
-        regex = Union(regex, Power(T, i))
-    p[0] = regex
+    # Un solo nodo, en vez de la unión de T{N}, T{N+1}, ..., T{M}
+    p[0] = repeat(T, N, M)
 
 # K
 def p_K(p) -> RegEx:
@@ -133,7 +125,7 @@ def p_braces(p) -> RegEx:
 # [F
 def p_CHAR_RANGE(p) -> RegEx:
     'K : LCORCHETE F'
-    p[0] = p[2]
+    p[0] = char_class(p[2])
 
 # SYMB
 def p_SYMB(p) -> RegEx:
@@ -143,16 +135,12 @@ def p_SYMB(p) -> RegEx:
 # _W
 def p_W(p) -> RegEx:
     'K : _W'
-    regex = Char('_')
-    regex = Union(regex, UnionRange('a', 'z'))
-    regex = Union(regex, UnionRange('A', 'Z'))
-    regex = Union(regex, UnionRange('0', '9'))
-    p[0] = regex
+    p[0] = char_class({'_'} | CharRange('a', 'z') | CharRange('A', 'Z') | CharRange('0', '9'))
 
 # _D
 def p_D(p) -> RegEx:
     'K : _D'
-    p[0] = UnionRange('0', '9')
+    p[0] = char_class(CharRange('0', '9'))
 
 # RANGE
 # Este es un caso especial. El token RANGE puede aparecer fuera de corchetes,
@@ -164,23 +152,23 @@ def p_RANGE(p) -> RegEx:
     rango = p[1].split('-')
     N = Char(rango[0])
     M = Char(rango[1])
-    p[0] = Concat(Concat(N, Char('-')), M)
+    p[0] = concat(N, Char('-'), M)
 
 
 ### Producciones de F
 ### F    -> SYMBF | RANGEF | ]
 
 # SYMB F
-def p_SYMBF(p) -> RegEx:
+def p_SYMBF(p) -> set:
     'F : SYMB F'
-    # F puede ser la unión de otro rango de caracteres o puede ser Empty
-    p[0] = Union(Char(p[1]), p[2])
+    # F son los caracteres que siguen (puede ser vacío)
+    p[0] = {p[1]} | p[2]
 
 # RANGE F
-def p_RANGEF(p) -> RegEx:
+def p_RANGEF(p) -> set:
     'F : RANGE F'
 
-    F = p[2] # Puede ser la unión de otro rango de caracteres o puede ser Empty
+    F = p[2] # Los caracteres que siguen (puede ser vacío)
 
     # p[1] es un string: n-m, dondé n y m son chr
     rango  = p[1].split("-")
@@ -190,12 +178,12 @@ def p_RANGEF(p) -> RegEx:
     if ord(M) < ord(N): # ¿Es un rango inválido?
         raise SyntaxError
 
-    p[0] = Union(UnionRange(N,M), F)
+    p[0] = CharRange(N,M) | F
 
 # ]
-def p_RCORCHETE(p) -> RegEx:
+def p_RCORCHETE(p) -> set:
     'F : RCORCHETE'
-    p[0] = Empty()
+    p[0] = set()
 
 
 # Producciones de SYMB
@@ -1,29 +1,63 @@
 from abc import ABC, abstractmethod
+from os.path import commonprefix
+from typing import Iterable, Optional
 
 from automata import AFND
+from regex.cache import CacheLRU
+from regex.compiled import CompiledRegex, CONSTRUCTIONS, ENGINES
+from regex.prefilter import Prefilter, PrefilterStats
 
 __all__ = [
+    "CacheLRU",
+    "CompiledRegex",
+    "CONSTRUCTIONS",
+    "ENGINES",
+    "Prefilter",
+    "PrefilterStats",
+    "afd_cache",
     "RegEx",
     "Empty",
     "Lambda",
     "Char",
+    "CharClass",
     "Union",
     "Concat",
     "Star",
-    "Plus"
+    "Plus",
+    "Repeat"
 ]
 
-cached_AFD   = AFND()
-cached_REGEX = ""
+# Cache de expresiones regulares compiladas, indexado por su estructura
+afd_cache = CacheLRU()
 
 class RegEx(ABC):
     """Clase abstracta para representar expresiones regulares."""
 
-    @abstractmethod
     def naive_match(self, word: str) -> bool:
         """
-        Indica si la expresión regular acepta la cadena dada.
-        Implementación recursiva, poco eficiente.
+        Indica si la expresión regular acepta la cadena dada, recorriendo el
+        árbol (sin armar autómatas). Sirve como referencia para los motores.
+
+        Para cada nodo y cada posición i de la cadena calculamos (una sola
+        vez) las posiciones j tales que el nodo acepta word[i:j], sin
+        recortar la cadena. Así el tiempo es polinomial en el largo de la
+        cadena, y no exponencial como probar todos los cortes recursivamente.
+        """
+        return len(word) in self._naive(word, 0, {})
+
+    def _naive(self, word: str, i: int, memo: dict) -> frozenset:
+        """(Interno) Devuelve _naive_ends(word, i), guardando el resultado en memo."""
+        try:
+            return memo[self, i]
+        except KeyError:
+            ends = memo[self, i] = self._naive_ends(word, i, memo)
+            return ends
+
+    @abstractmethod
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        """
+        (Interno) Devuelve las posiciones j tales que la expresión acepta
+        word[i:j]. Los hijos se consultan con _naive, para reusar memo.
         """
         pass
 
@@ -32,23 +66,125 @@ class RegEx(ABC):
 
         ### Ésto corre por cada linea ###
 
-        # Declaramos éstas variables como globales
-        global cached_AFD   # Tenemos un AFD cacheado.
-        global cached_REGEX # RegEX del AFD cacheado
+        return self.compile().match(word)
 
-        # ¿Armamos AFD?
-        # Si el RegEx que quiero matchear no coincide con el del AFD cacheado, armo un nuevo AFD 
-        if str(self) != cached_REGEX:
-            cached_REGEX = str(self)
-            cached_AFD   = self.to_afnd().determinize().minimize()
+    def search(self, word: str) -> Optional[int]:
+        """
+        Busca la expresión regular dentro de la cadena dada. Devuelve la
+        posición donde termina la primera ocurrencia, o None si no hay ninguna.
+        """
+        return self.compile().search(word)
 
-        return cached_AFD.accept_string(word)
+    def compile(self, engine: str = "afd", construction: str = "thompson",
+                max_afd_states: Optional[int] = None) -> CompiledRegex:
+        """
+        Compila la expresión regular con el motor indicado (ver ENGINES),
+        armando el AFND con la construcción indicada (ver CONSTRUCTIONS) y
+        AFDs de a lo sumo max_afd_states estados (ver CompiledRegex). El
+        resultado se puede guardar y reusar para matchear muchas cadenas.
+        """
+
+        # La versión compilada queda guardada en el nodo la primera vez, así
+        # las siguientes llamadas no recorren el árbol (ni para calcular la clave).
+        # Obs: por eso la RegEx no debería modificarse después de usarla.
+        opciones = (engine, construction, max_afd_states)
+        try:
+            return self._compiled[opciones]
+        except AttributeError:
+            self._compiled = {}
+        except KeyError:
+            pass
+
+        # Si no está en el cache, la armamos
+        self._compiled[opciones] = afd_cache.get(
+            (*opciones, self._key()),
+            lambda: CompiledRegex.build(self, engine, construction, max_afd_states)
+        )
+        return self._compiled[opciones]
+
+    def required_literal(self) -> str:
+        """
+        Devuelve un literal que aparece en toda cadena aceptada por la
+        expresión regular (el más largo que encontramos), o "" si no hay
+        ninguno. Se usa para descartar cadenas antes de matchear (ver Prefilter).
+        """
+        literales = self._literals()
+        return literales[3] if literales is not None else ""
+
+    def to_afnd(self, construction: str = "thompson") -> AFND:
+        """
+        Convierte la expresión regular a un AFND. La construcción puede ser:
+        - "thompson": los estados son enteros que se van asignando a medida
+          que se recorre el árbol, así que es lineal en el tamaño de la
+          expresión, pero usa muchas transiciones λ.
+        - "glushkov": el autómata de posiciones, sin transiciones λ, con un
+          estado por cada aparición de un carácter (más el inicial).
+        """
+        if construction == "thompson":
+            afnd = AFND()
+            qi, qf = self._thompson(afnd)
+            afnd.mark_initial_state(qi)
+            afnd.mark_final_state(qf)
+            return afnd
+        if construction == "glushkov":
+            return self._to_afnd_glushkov()
+        raise ValueError(f"Construcción desconocida: {construction} (las construcciones son {', '.join(CONSTRUCTIONS)}).")
+
+    def _to_afnd_glushkov(self) -> AFND:
+        """(Interno) Arma el autómata de posiciones (Glushkov) de la expresión regular."""
+
+        posiciones = [None] # posiciones[p] = caracteres de la posición p (la 0 es el estado inicial)
+        follow = {}         # follow[p] = posiciones que pueden seguir a la posición p
+        nullable, first, last = self._glushkov(posiciones, follow)
+
+        afnd = AFND()
+        afnd.add_state(0, nullable)
+        afnd.mark_initial_state(0)
+        for p in range(1, len(posiciones)):
+            afnd.add_state(p, p in last)
+
+        # Entrar a la posición p es consumir alguno de sus caracteres
+        # (la posición de un Char es un string de un carácter, que también
+        # se puede recorrer)
+        for p in first:
+            for a in posiciones[p]:
+                afnd.add_transition(0, p, a)
+        for q, siguientes in follow.items():
+            for p in siguientes:
+                for a in posiciones[p]:
+                    afnd.add_transition(q, p, a)
+
+        return afnd
 
     @abstractmethod
-    def to_afnd(self) -> AFND:
-        """Convierte la expresión regular a un AFND."""
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
+        """
+        (Interno) Agrega al AFND los estados y transiciones de la expresión
+        regular, y devuelve su estado inicial y su estado final. Desde afuera
+        sólo se llega al fragmento por el inicial y sólo se sale por el final.
+        """
         pass
 
+    @abstractmethod
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        """
+        (Interno) Numera las apariciones de caracteres de la expresión regular
+        (agregándolas a posiciones), completa follow, y devuelve si la
+        expresión acepta λ y sus conjuntos first y last de posiciones.
+        """
+        pass
+
+    @abstractmethod
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        """
+        (Interno) Devuelve información sobre los literales de la expresión:
+        - exacto: la única cadena que acepta, o None si no es una sola.
+        - prefijo: un literal con el que empiezan todas las cadenas aceptadas.
+        - sufijo: un literal con el que terminan todas las cadenas aceptadas.
+        - requerido: un literal que aparece en todas las cadenas aceptadas.
+        Si la expresión no acepta ninguna cadena, devuelve None.
+        """
+        pass
 
     @abstractmethod
     def _atomic(self) -> bool:
@@ -58,24 +194,40 @@ class RegEx(ABC):
         """
         pass
 
+    @abstractmethod
+    def _key(self) -> tuple:
+        """
+        (Interno) Devuelve una clave que identifica la estructura de la
+        expresión regular. A diferencia de __str__, dos expresiones distintas
+        nunca comparten clave (por ejemplo, Plus(Lambda()) y
+        Concat(Lambda(), Char('+')) se imprimen igual).
+        """
+        pass
+
 
 class Empty(RegEx):
     """Expresión regular que denota el lenguaje vacío (∅)."""
 
-    def naive_match(self, word: str):
-        return False
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        return frozenset()
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
 
-    def to_afnd(self) -> AFND:
+        # Dos estados sin ninguna transición: el final es inalcanzable
+        return afnd.new_state(), afnd.new_state()
 
-        # Un AFND con un único estado que es inicial y no es final
-        RES = AFND()
-        RES.add_state("q0", False)
-        RES.mark_initial_state("q0")
-        return RES
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        return False, set(), set()
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        return None
 
     def _atomic(self):
         return True
 
+    def _key(self):
+        return ("∅",)
+
     def __str__(self):
         return "∅"
 
@@ -83,20 +235,28 @@ class Empty(RegEx):
 class Lambda(RegEx):
     """Expresión regular que denota el lenguaje de la cadena vacía (Λ)."""
 
-    def naive_match(self, word: str):
-        return word == ""
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        return frozenset({i})
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
 
-    def to_afnd(self) -> AFND:
+        # El final se alcanza sin consumir nada
+        qi, qf = afnd.new_state(), afnd.new_state()
+        afnd.add_transition(qi, qf, "λ")
+        return qi, qf
 
-        # Un AFND con un único estado que es inicial y final
-        RES = AFND()
-        RES.add_state("q0", True)
-        RES.mark_initial_state("q0")
-        return RES
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        return True, set(), set()
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        return "", "", "", ""
 
     def _atomic(self):
         return True
 
+    def _key(self):
+        return ("λ",)
+
     def __str__(self):
         return "λ"
 
@@ -108,170 +268,224 @@ class Char(RegEx):
         assert len(char) == 1
         self.char = char
 
-    def naive_match(self, word: str):
-        return word == self.char
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        return frozenset({i + 1}) if i < len(word) and word[i] == self.char else frozenset()
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
 
-    def to_afnd(self) -> AFND:
+        qi, qf = afnd.new_state(), afnd.new_state()
+        afnd.add_transition(qi, qf, self.char)
+        return qi, qf
 
-        RES = AFND()
-        RES.add_state("q0", False)
-        RES.add_state("q1", True)
-        RES.mark_initial_state("q0")
-        RES.add_transition("q0", "q1", self.char)
-        return RES
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        p = len(posiciones)
+        posiciones.append(self.char)
+        follow[p] = set()
+        return False, {p}, {p}
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        return self.char, self.char, self.char, self.char
 
     def _atomic(self):
         return True
 
+    def _key(self):
+        return ("char", self.char)
+
     def __str__(self):
         return self.char
 
 
-class Concat(RegEx):
-    """Expresión regular que denota la concatenación de dos expresiones regulares."""
-
-    def __init__(self, exp1: RegEx, exp2: RegEx):
-        self.exp1 = exp1
-        self.exp2 = exp2
-
-    def naive_match(self, word: str):
-        for i in range(len(word) + 1):
-            if self.exp1.naive_match(word[:i]) and self.exp2.naive_match(word[i:]):
-                return True
-        return False
-
-    def to_afnd(self) -> AFND:
+class CharClass(RegEx):
+    """
+    Expresión regular que denota el lenguaje de un conjunto de caracteres
+    (como [a-z], \\w o \\d). Equivale a la unión de los caracteres, pero su
+    AFND tiene sólo dos estados.
+    """
 
-        RES = AFND()               # Hago el AFND de retorno
-        AFND1 = self.exp1.to_afnd() # Hago el AFND de la primer  expresión
-        AFND2 = self.exp2.to_afnd() # Hago el AFND de la segunda expresión
+    def __init__(self, chars: Iterable[str]):
+        self.chars = frozenset(chars)
+        assert all(len(char) == 1 for char in self.chars)
 
-        # Agregamos todos los estados de la primer expresión a RES.
-        # No hace falta marcar los estados finales de AFND1 como finales de RES
-        for q in AFND1.states: 
-            RES.add_state(q, False)
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        return frozenset({i + 1}) if i < len(word) and word[i] in self.chars else frozenset()
 
-        # Agregamos los estados de AFND2 a RES
-        num  = 0
-        name = str(num)
-        
-        # TODO: ¡Quitar este copy!
-        for q in AFND2.states.copy(): #copy() porque sino daba "Set changed size during iteration"
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
 
-            # Creo el nombre nuevo del estado
-            AFND2._rename_state(q, name)
+        # Una transición por carácter, todas entre los mismos dos estados
+        qi, qf = afnd.new_state(), afnd.new_state()
+        for char in self.chars:
+            afnd.add_transition(qi, qf, char)
+        return qi, qf
 
-            if name in AFND2.final_states:
-                RES.add_state(name, True)
-            else:
-                RES.add_state(name, False)
-            
-            num += 1
-            name = str(num)
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        p = len(posiciones)
+        posiciones.append(sorted(self.chars))
+        follow[p] = set()
+        return False, {p}, {p}
 
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        if not self.chars:
+            return None
+        if len(self.chars) == 1:
+            char = next(iter(self.chars))
+            return char, char, char, char
+        return None, "", "", ""
 
-        # Agregamos las transiciones de AFND1
-        for q in AFND1.states:
-            RES.transitions[q] = AFND1.transitions[q]
-
-        # Agregamos las transiciones de AFND2
-        for q in AFND2.states:
-            RES.transitions[q] = AFND2.transitions[q]
-
-        # Mergeamos el alfabeto
-        RES.alphabet = (AFND1.alphabet).union(AFND2.alphabet)
-
-        # Conectamos los estados finales de AFND1 con el inicial de AFND2
-        for q in AFND1.final_states:
-            RES.add_transition(q, AFND2.initial_state, "λ")
+    def _atomic(self):
+        return True
 
-        RES.mark_initial_state(AFND1.initial_state)
+    def _key(self):
+        return ("class", tuple(sorted(self.chars)))
 
-        # Normalizamos los estados
-        RES.normalize_states()
+    def __str__(self):
+        # Juntamos los caracteres consecutivos en rangos
+        codigos = sorted(map(ord, self.chars))
+        partes = []
+        i = 0
+        while i < len(codigos):
+            j = i
+            while j + 1 < len(codigos) and codigos[j + 1] == codigos[j] + 1:
+                j += 1
+            if j - i >= 2:
+                partes.append(f"{chr(codigos[i])}-{chr(codigos[j])}")
+            else:
+                partes.extend(map(chr, codigos[i:j + 1]))
+            i = j + 1
+        return f"[{''.join(partes)}]"
 
-        return RES
 
+class Concat(RegEx):
+    """Expresión regular que denota la concatenación de dos o más expresiones regulares."""
+
+    def __init__(self, *exps: RegEx):
+        assert len(exps) >= 2
+        self.exps = exps
+
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        # Cada expresión empieza donde puede terminar la anterior
+        ends = {i}
+        for exp in self.exps:
+            ends = {j for k in ends for j in exp._naive(word, k, memo)}
+            if not ends:
+                break
+        return frozenset(ends)
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
+
+        # Conectamos el final de cada expresión con el inicial de la siguiente
+        qi, qf = self.exps[0]._thompson(afnd)
+        for exp in self.exps[1:]:
+            qi2, qf2 = exp._thompson(afnd)
+            afnd.add_transition(qf, qi2, "λ")
+            qf = qf2
+        return qi, qf
+
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        nullable, first, last = self.exps[0]._glushkov(posiciones, follow)
+        for exp in self.exps[1:]:
+            nullable2, first2, last2 = exp._glushkov(posiciones, follow)
+
+            # Después del final de lo anterior puede empezar la siguiente expresión
+            for p in last:
+                follow[p] |= first2
+
+            first = first | first2 if nullable else first
+            last = last | last2 if nullable2 else last2
+            nullable = nullable and nullable2
+        return nullable, first, last
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        literales = self.exps[0]._literals()
+        for exp in self.exps[1:]:
+            literales2 = exp._literals()
+            if literales is None or literales2 is None:
+                return None
+            exacto1, prefijo1, sufijo1, requerido1 = literales
+            exacto2, prefijo2, sufijo2, requerido2 = literales2
+
+            exacto = exacto1 + exacto2 if exacto1 is not None and exacto2 is not None else None
+            prefijo = exacto1 + prefijo2 if exacto1 is not None else prefijo1
+            sufijo = sufijo1 + exacto2 if exacto2 is not None else sufijo2
+
+            # El literal puede cruzar el límite entre las dos expresiones
+            requerido = max(requerido1, requerido2, sufijo1 + prefijo2, key=len)
+            literales = exacto, prefijo, sufijo, requerido
+        return literales
 
     def _atomic(self):
         return False
 
+    def _key(self):
+        return ("concat",) + tuple(exp._key() for exp in self.exps)
+
     def __str__(self):
-        return f"{f'({self.exp1})' if not self.exp1._atomic() else self.exp1}" \
-            f"{f'({self.exp2})' if not self.exp2._atomic() else self.exp2}"
+        return "".join(f"({exp})" if not exp._atomic() else str(exp) for exp in self.exps)
 
 
 class Union(RegEx):
-    """Expresión regular que denota la unión de dos expresiones regulares."""
-
-    def __init__(self, exp1: RegEx, exp2: RegEx):
-        self.exp1 = exp1
-        self.exp2 = exp2
-
-    def naive_match(self, word: str):
-        return self.exp1.naive_match(word) or self.exp2.naive_match(word)
-
-    def to_afnd(self) -> AFND:
-        
-        RES = AFND()               # AFND de la unión
-        AFND1 = self.exp1.to_afnd() # AFND de la primer  expresióin
-        AFND2 = self.exp2.to_afnd() # AFND de la segunda expresión
-        
-        # Agrego a RES los estados de AFND1
-        for q in AFND1.states: 
-            if q in AFND1.final_states:
-                RES.add_state(q, True)
-            else:
-                RES.add_state(q, False)
-
-        # Agregamos los estados de AFND2 a RES
-        # Tenemos que renombrar los estados para que no coindidan con los de AFND1
-
-        num  = 0
-        name = str(num)
-
-        for q in AFND2.states.copy(): #copy() porque sino daba "Set changed size during iteration"
-
-            AFND2._rename_state(q, name)
-
-            if name in AFND2.final_states:
-                RES.add_state(name, True)
-            else:
-                RES.add_state(name, False)
-            
-            num += 1
-            name = str(num)
-
-
-        # Agregamos las transiciones de AFND1
-        for q in AFND1.states:
-            RES.transitions[q] = AFND1.transitions[q]
-
-        # Agregamos las transiciones de AFND2
-        for q in AFND2.states:
-            RES.transitions[q] = AFND2.transitions[q]
-
-        # Mergeamos el alfabeto
-        RES.alphabet = (AFND1.alphabet).union(AFND2.alphabet)
-
-        # Agregamos un nuevo estado inicial, y lo conectamos con los iniciales de AFND1 y AFND2
-        RES.add_state("qi", False)
-        RES.mark_initial_state("qi")
-        RES.add_transition("qi", AFND1.initial_state, "λ")
-        RES.add_transition("qi", AFND2.initial_state, "λ")
-
-        # Normalizamos los estados (por si tenemos nombres repetidos)
-        RES.normalize_states()
-
-        return RES
-
+    """Expresión regular que denota la unión de dos o más expresiones regulares."""
+
+    def __init__(self, *exps: RegEx):
+        assert len(exps) >= 2
+        self.exps = exps
+
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        ends = set()
+        for exp in self.exps:
+            ends |= exp._naive(word, i, memo)
+        return frozenset(ends)
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
+
+        # Un inicial nuevo que va a los iniciales de todas las expresiones,
+        # y un final nuevo al que van los finales de todas
+        qi = afnd.new_state()
+        finales = []
+        for exp in self.exps:
+            qi1, qf1 = exp._thompson(afnd)
+            afnd.add_transition(qi, qi1, "λ")
+            finales.append(qf1)
+        qf = afnd.new_state()
+        for qf1 in finales:
+            afnd.add_transition(qf1, qf, "λ")
+        return qi, qf
+
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        nullable, first, last = False, set(), set()
+        for exp in self.exps:
+            nullable1, first1, last1 = exp._glushkov(posiciones, follow)
+            nullable, first, last = nullable or nullable1, first | first1, last | last1
+        return nullable, first, last
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        # Las ramas que no aceptan ninguna cadena no cuentan
+        ramas = [literales for literales in (exp._literals() for exp in self.exps) if literales is not None]
+        if not ramas:
+            return None
+
+        literales = ramas[0]
+        for literales2 in ramas[1:]:
+            exacto1, prefijo1, sufijo1, requerido1 = literales
+            exacto2, prefijo2, sufijo2, requerido2 = literales2
+
+            exacto = exacto1 if exacto1 == exacto2 else None
+            prefijo = commonprefix([prefijo1, prefijo2])
+            sufijo = commonprefix([sufijo1[::-1], sufijo2[::-1]])[::-1]
+
+            # Sólo sabemos que aparece lo que comparten ambas ramas
+            requerido = requerido1 if requerido1 == requerido2 else max(prefijo, sufijo, key=len)
+            literales = exacto, prefijo, sufijo, requerido
+        return literales
 
     def _atomic(self):
         return False
 
+    def _key(self):
+        return ("union",) + tuple(exp._key() for exp in self.exps)
+
     def __str__(self):
-        return f"{f'({self.exp1})' if not self.exp1._atomic() else self.exp1}" \
-            f"|{f'({self.exp2})' if not self.exp2._atomic() else self.exp2}"
+        return "|".join(f"({exp})" if not exp._atomic() else str(exp) for exp in self.exps)
 
 
 class Star(RegEx):
@@ -280,32 +494,51 @@ class Star(RegEx):
     def __init__(self, exp: RegEx):
         self.exp = exp
 
-    def naive_match(self, word: str):
-        if word == "" or self.exp.naive_match(word):
-            return True
-        for i in range(1, len(word) + 1):
-            if self.exp.naive_match(word[:i]) and self.naive_match(word[i:]):
-                return True
-        return False
-
-    def to_afnd(self) -> AFND:
-        
-        afnd = self.exp.to_afnd()
-
-        afnd.add_state("qi", False)
-        afnd.add_state("qf", True)
-        afnd.add_transition("qi", afnd.initial_state, "λ")
-        afnd.mark_initial_state("qi")
-        for q in afnd.final_states:
-            afnd.add_transition(q, "qf", "λ")
-            afnd.add_transition(q, "qi", "λ")
-        afnd.add_transition("qi", "qf", "λ")
-        afnd.normalize_states()
-        return afnd
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        # Recorremos las posiciones alcanzables repitiendo la expresión
+        # (iterativamente, así no depende del largo de la cadena)
+        ends = {i}
+        pendientes = [i]
+        while pendientes:
+            k = pendientes.pop()
+            for j in self.exp._naive(word, k, memo):
+                if j not in ends:
+                    ends.add(j)
+                    pendientes.append(j)
+        return frozenset(ends)
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
+
+        # Desde el inicial nuevo podemos saltear la expresión, y desde su
+        # final podemos volver a empezarla
+        qi = afnd.new_state()
+        qi1, qf1 = self.exp._thompson(afnd)
+        qf = afnd.new_state()
+        afnd.add_transition(qi, qi1, "λ")
+        afnd.add_transition(qi, qf, "λ")
+        afnd.add_transition(qf1, qi1, "λ")
+        afnd.add_transition(qf1, qf, "λ")
+        return qi, qf
+
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        _, first, last = self.exp._glushkov(posiciones, follow)
+
+        # Después del final de la expresión puede volver a empezar
+        for p in last:
+            follow[p] |= first
+
+        return True, first, last
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        # Acepta λ, así que no hay ningún literal obligatorio
+        return "" if self.exp._literals() is None else None, "", "", ""
 
     def _atomic(self):
         return False
 
+    def _key(self):
+        return ("star", self.exp._key())
+
     def __str__(self):
         return f"({self.exp})*" if not self.exp._atomic() else f"{self.exp}*"
 
@@ -316,20 +549,146 @@ class Plus(RegEx):
     def __init__(self, exp: RegEx):
         self.exp = exp
 
-    def naive_match(self, word: str):
-        if self.exp.naive_match(word):
-            return True
-        for i in range(1, len(word) + 1):
-            if self.exp.naive_match(word[:i]) and self.naive_match(word[i:]):
-                return True
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        # Como Star, pero leyendo la expresión al menos una vez
+        ends = set(self.exp._naive(word, i, memo))
+        pendientes = list(ends)
+        while pendientes:
+            k = pendientes.pop()
+            for j in self.exp._naive(word, k, memo):
+                if j not in ends:
+                    ends.add(j)
+                    pendientes.append(j)
+        return frozenset(ends)
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
+
+        # Como Star, pero sin poder saltear la expresión
+        qi = afnd.new_state()
+        qi1, qf1 = self.exp._thompson(afnd)
+        qf = afnd.new_state()
+        afnd.add_transition(qi, qi1, "λ")
+        afnd.add_transition(qf1, qi1, "λ")
+        afnd.add_transition(qf1, qf, "λ")
+        return qi, qf
+
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+        nullable, first, last = self.exp._glushkov(posiciones, follow)
+
+        # Después del final de la expresión puede volver a empezar
+        for p in last:
+            follow[p] |= first
+
+        return nullable, first, last
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        # La expresión aparece al menos una vez (al principio y al final)
+        literales = self.exp._literals()
+        if literales is None:
+            return None
+        _, prefijo, sufijo, requerido = literales
+        return None, prefijo, sufijo, requerido
+
+    def _atomic(self) -> bool:
         return False
 
-    def to_afnd(self) -> AFND:
-        RES = Concat(self.exp, Star(self.exp)).to_afnd()
-        return RES
+    def _key(self):
+        return ("plus", self.exp._key())
+
+    def __str__(self):
+        return f"({self.exp})+" if not self.exp._atomic() else f"{self.exp}+"
+
+
+class Repeat(RegEx):
+    """
+    Expresión regular que denota entre min y max repeticiones de otra
+    expresión regular (exp{min,max}).
+    """
+
+    def __init__(self, exp: RegEx, min: int, max: int):
+        if min < 0 or max < min:
+            raise ValueError(f"Rango de repeticiones inválido: {{{min},{max}}}.")
+        self.exp = exp
+        self.min = min
+        self.max = max
+
+    def _naive_ends(self, word: str, i: int, memo: dict) -> frozenset:
+        # actuales son las posiciones hasta las que se llega con k repeticiones
+        ends = set()
+        actuales = {i}
+        for k in range(self.max + 1):
+            if k >= self.min:
+                ends |= actuales
+            if k == self.max:
+                break
+            siguientes = {j for q in actuales for j in self.exp._naive(word, q, memo)}
+            # Si ya no cambia, las demás repeticiones no agregan nada
+            if not siguientes or (siguientes == actuales and k >= self.min):
+                break
+            actuales = siguientes
+        return frozenset(ends)
+
+    def _thompson(self, afnd: AFND) -> tuple[int, int]:
+
+        # Primero las min repeticiones obligatorias, una detrás de otra. Después
+        # las opcionales: desde el final de cada una se puede saltar al final
+        # de todo, así que el AFND es lineal en max (y no cuadrático, como
+        # la unión de exp{min}, exp{min+1}, ..., exp{max}).
+        qi = afnd.new_state()
+        q = qi
+        for _ in range(self.min):
+            qi1, qf1 = self.exp._thompson(afnd)
+            afnd.add_transition(q, qi1, "λ")
+            q = qf1
+
+        qf = afnd.new_state()
+        afnd.add_transition(q, qf, "λ")
+        for _ in range(self.max - self.min):
+            qi1, qf1 = self.exp._thompson(afnd)
+            afnd.add_transition(q, qi1, "λ")
+            q = qf1
+            afnd.add_transition(q, qf, "λ")
+        return qi, qf
+
+    def _glushkov(self, posiciones: list, follow: dict) -> tuple[bool, set, set]:
+
+        # Concatenamos max copias de la expresión, donde las últimas
+        # max - min son opcionales (exp{1,3} = exp(exp|λ)(exp|λ))
+        nullable, first, last = True, set(), set()
+        for k in range(self.max):
+            nullable2, first2, last2 = self.exp._glushkov(posiciones, follow)
+            nullable2 = nullable2 or k >= self.min
+
+            for p in last:
+                follow[p] |= first2
+
+            first = first | first2 if nullable else first
+            last = last | last2 if nullable2 else last2
+            nullable = nullable and nullable2
+
+        return nullable, first, last
+
+    def _literals(self) -> Optional[tuple[Optional[str], str, str, str]]:
+        literales = self.exp._literals()
+        if self.min == 0:
+            # Acepta λ, así que no hay ningún literal obligatorio
+            return "" if self.max == 0 or literales is None else None, "", "", ""
+        if literales is None:
+            return None
+
+        exacto, prefijo, sufijo, requerido = literales
+        if exacto is None:
+            return None, prefijo, sufijo, requerido
+        # Las repeticiones obligatorias de una cadena fija forman un literal
+        obligatorio = exacto * self.min
+        return obligatorio if self.min == self.max else None, obligatorio, obligatorio, obligatorio
 
     def _atomic(self) -> bool:
         return False
 
+    def _key(self):
+        return ("repeat", self.exp._key(), self.min, self.max)
+
     def __str__(self):
-        return f"({self.exp})+" if not self.exp._atomic() else f"{self.exp}+"
\ No newline at end of file
+        rango = f"{{{self.min}}}" if self.min == self.max else f"{{{self.min},{self.max}}}"
+        return f"({self.exp}){rango}" if not self.exp._atomic() else f"{self.exp}{rango}"
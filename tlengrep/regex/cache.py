@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+__all__ = ["CacheLRU"]
+
+
+class CacheLRU:
+    """
+    Cache de autómatas compilados con política de desalojo LRU
+    (se desaloja la entrada usada hace más tiempo).
+    """
+
+    def __init__(self, capacity: int = 32):
+        if capacity < 1:
+            raise ValueError(f"La capacidad del cache debe ser positiva (recibimos {capacity}).")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor asociado a key. Si no está en el cache, lo construye
+        llamando a build() y lo guarda.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        # Construimos fuera del lock: compilar puede tardar y no queremos
+        # frenar a los que sí encuentran su autómata en el cache
+        value = build()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+        return value
+
+    def set_capacity(self, capacity: int):
+        """Cambia la capacidad del cache, desalojando entradas si hace falta."""
+        if capacity < 1:
+            raise ValueError(f"La capacidad del cache debe ser positiva (recibimos {capacity}).")
+        with self._lock:
+            self.capacity = capacity
+            self._evict()
+
+    def clear(self):
+        """Vacía el cache y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Devuelve los contadores del cache."""
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self):
+        """(Interno) Desaloja las entradas menos usadas hasta respetar la capacidad."""
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
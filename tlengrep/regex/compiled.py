@@ -0,0 +1,292 @@
+from threading import Lock
+from typing import Iterable, Iterator, Optional
+
+from automata import AFDLazy, BitParallelNFA, StateLimitExceeded, TablaAFD
+from automata.bitparallel import MAX_STATES as MAX_BITPARALLEL_STATES
+from regex.prefilter import Prefilter, PrefilterStats
+
+__all__ = ["CompiledRegex", "CONSTRUCTIONS", "ENGINES"]
+
+# Motores con los que se puede compilar una expresión regular:
+# - afd: AFD mínimo, guardado como una TablaAFD.
+# - lazy: AFD construido a medida que se lee la entrada (AFDLazy).
+# - derivatives: derivadas de Brzozowski, sin armar ningún autómata (DerivativeMatcher).
+# - bitparallel: simulación del AFND de Glushkov con conjuntos de bits (BitParallelNFA).
+# - nfa: simulación del AFND con conjuntos de bits, de cualquier tamaño (AFND.accept_string).
+# - auto: afd, salvo que su AFD sea muy grande (ahí, bitparallel si la expresión es chica, o nfa).
+ENGINES = ("afd", "lazy", "derivatives", "bitparallel", "nfa", "auto")
+
+# Cantidad máxima de estados del AFD que arma el motor auto (si no se indica otra)
+AUTO_MAX_AFD_STATES = 1000
+
+# Construcciones con las que se puede armar el AFND (ver RegEx.to_afnd)
+CONSTRUCTIONS = ("thompson", "glushkov")
+
+
+class CompiledRegex:
+    """
+    Expresión regular compilada con alguno de los motores de ENGINES.
+
+    Es inmutable, así que una misma instancia puede guardarse y compartirse
+    entre threads sin volver a pagar la construcción del autómata. (El motor
+    lazy completa su cache al matchear, y los motores para buscar se arman la
+    primera vez que se usan, con un lock para que los arme un solo thread,
+    pero eso no cambia qué cadenas acepta.)
+
+    Si la expresión tiene un literal obligatorio (ver RegEx.required_literal),
+    las cadenas que no lo contienen se descartan sin correr el autómata (ver
+    Prefilter).
+
+    Si se indica max_afd_states, ningún AFD que se arme puede tener más
+    estados: si la determinización los supera, se corta y se simula el AFND
+    en su lugar (ver stats).
+    """
+
+    __slots__ = ("_afnd", "_lock", "_motor", "_motor_bytes", "_motor_search", "_motor_search_bytes", "_stats", "engine",
+                 "max_afd_states", "pattern", "prefilter")
+
+    def __init__(self, motor, motor_bytes, engine: str, pattern: str = "", afnd=None,
+                 motor_search=None, motor_search_bytes=None, prefilter: Optional[Prefilter] = None,
+                 max_afd_states: Optional[int] = None, stats: Optional[dict] = None):
+        object.__setattr__(self, "_afnd", afnd)
+        object.__setattr__(self, "_lock", Lock())
+        object.__setattr__(self, "_motor", motor)
+        object.__setattr__(self, "_motor_bytes", motor_bytes)
+        object.__setattr__(self, "_motor_search", motor_search)
+        object.__setattr__(self, "_motor_search_bytes", motor_search_bytes)
+        object.__setattr__(self, "_stats", stats if stats is not None else {})
+        object.__setattr__(self, "engine", engine)
+        object.__setattr__(self, "max_afd_states", max_afd_states)
+        object.__setattr__(self, "pattern", pattern)
+        object.__setattr__(self, "prefilter", prefilter)
+
+    @classmethod
+    def build(cls, regex, engine: str = "afd", construction: str = "thompson",
+              max_afd_states: Optional[int] = None) -> "CompiledRegex":
+        """
+        Compila la expresión regular con el motor y la construcción indicados,
+        armando AFDs de a lo sumo max_afd_states estados (si se indica).
+        """
+        if max_afd_states is not None and max_afd_states < 1:
+            raise ValueError(f"La cantidad máxima de estados debe ser positiva (recibimos {max_afd_states}).")
+        literal = regex.required_literal()
+        prefilter = Prefilter(literal) if literal else None
+        stats = {"requested_engine": engine, "afnd_states": None, "afd_states": None, "fallback": False,
+                 "search_fallback": False}
+
+        if engine == "afd":
+            afnd = regex.to_afnd(construction)
+            return cls._build_bounded(regex, afnd, max_afd_states, prefilter, stats)
+        if engine == "lazy":
+            afnd = regex.to_afnd(construction)
+            stats["afnd_states"] = afnd.size()
+            # El cache del AFD lazy tampoco puede superar la cantidad máxima de estados
+            cache = {} if max_afd_states is None else {"max_states": max_afd_states}
+            return cls(AFDLazy(afnd, **cache), AFDLazy(afnd.to_bytes(), **cache), engine, str(regex),
+                       motor_search=AFDLazy(afnd, unanchored=True, **cache),
+                       motor_search_bytes=AFDLazy(afnd.to_bytes(), unanchored=True, **cache),
+                       prefilter=prefilter, max_afd_states=max_afd_states, stats=stats)
+        if engine == "derivatives":
+            # Se importa acá porque regex.derivatives usa los nodos de regex,
+            # que a su vez importa este módulo
+            from regex.derivatives import DerivativeMatcher
+            cache = {} if max_afd_states is None else {"max_states": max_afd_states}
+            matcher = DerivativeMatcher(regex, **cache)
+            searcher = DerivativeMatcher(regex, unanchored=True, **cache)
+            return cls(matcher, matcher, engine, str(regex), motor_search=searcher, motor_search_bytes=searcher,
+                       prefilter=prefilter, max_afd_states=max_afd_states, stats=stats)
+        if engine == "bitparallel":
+            # La simulación necesita el autómata de Glushkov (sin transiciones λ)
+            return cls._build_bitparallel(regex, regex.to_afnd("glushkov"), prefilter, max_afd_states, stats)
+        if engine == "nfa":
+            return cls._build_nfa(regex, regex.to_afnd(construction), prefilter, max_afd_states, stats)
+        if engine == "auto":
+            # Si la expresión es chica, usamos el autómata de Glushkov, para
+            # poder simularlo con bitparallel si el AFD resulta muy grande
+            glushkov = regex.to_afnd("glushkov")
+            afnd = glushkov if len(glushkov.states) <= MAX_BITPARALLEL_STATES else regex.to_afnd(construction)
+            limite = max_afd_states if max_afd_states is not None else AUTO_MAX_AFD_STATES
+            return cls._build_bounded(regex, afnd, limite, prefilter, stats, glushkov)
+        raise ValueError(f"Motor desconocido: {engine} (los motores son {', '.join(ENGINES)}).")
+
+    @classmethod
+    def _build_bounded(cls, regex, afnd, max_afd_states: Optional[int], prefilter: Optional[Prefilter],
+                       stats: dict, glushkov=None) -> "CompiledRegex":
+        """
+        (Interno) Determiniza el AFND con a lo sumo max_afd_states estados.
+        Si no alcanzan, en vez de seguir armando un AFD enorme (como el de
+        (a|b)*a(a|b){15}), lo simula: con bitparallel si la expresión es
+        chica, que es más rápido, o con nfa si no. Si ya se armó el autómata
+        de Glushkov, se puede pasar en glushkov para no volver a armarlo.
+        """
+        stats["afnd_states"] = afnd.size()
+        try:
+            afd = afnd.determinize(max_states=max_afd_states).minimize()
+        except StateLimitExceeded:
+            stats["fallback"] = True
+            if glushkov is None:
+                glushkov = regex.to_afnd("glushkov")
+            if len(glushkov.states) <= MAX_BITPARALLEL_STATES:
+                return cls._build_bitparallel(regex, glushkov, prefilter, max_afd_states, stats)
+            return cls._build_nfa(regex, afnd, prefilter, max_afd_states, stats)
+
+        stats["afd_states"] = afd.size()
+        # Los motores para buscar se arman recién cuando se usan (ver _searchers)
+        return cls(TablaAFD(afd), TablaAFD(afd.to_bytes()), "afd", str(regex), afnd=afnd, prefilter=prefilter,
+                   max_afd_states=max_afd_states, stats=stats)
+
+    @classmethod
+    def _build_bitparallel(cls, regex, afnd, prefilter: Optional[Prefilter], max_afd_states: Optional[int],
+                           stats: dict) -> "CompiledRegex":
+        """(Interno) Arma la expresión compilada con la simulación bit-paralela del AFND de Glushkov."""
+        stats["afnd_states"] = afnd.size()
+        matcher = BitParallelNFA(afnd)
+        searcher = BitParallelNFA(afnd, unanchored=True)
+        return cls(matcher, matcher, "bitparallel", str(regex), motor_search=searcher, motor_search_bytes=searcher,
+                   prefilter=prefilter, max_afd_states=max_afd_states, stats=stats)
+
+    @classmethod
+    def _build_nfa(cls, regex, afnd, prefilter: Optional[Prefilter], max_afd_states: Optional[int],
+                   stats: dict) -> "CompiledRegex":
+        """(Interno) Arma la expresión compilada con la simulación del AFND, sin determinizarlo."""
+        stats["afnd_states"] = afnd.size()
+        afnd_bytes = afnd.to_bytes()
+        return cls(afnd, afnd_bytes, "nfa", str(regex), motor_search=afnd, motor_search_bytes=afnd_bytes,
+                   prefilter=prefilter, max_afd_states=max_afd_states, stats=stats)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} es inmutable.")
+
+    def __reduce__(self):
+        # Para poder mandarla a otros procesos (pickle no puede usar __setattr__)
+        return (self.__class__, (self._motor, self._motor_bytes, self.engine, self.pattern, self._afnd,
+                                 self._motor_search, self._motor_search_bytes, self.prefilter,
+                                 self.max_afd_states, self._stats))
+
+    def _searchers(self) -> tuple:
+        """
+        (Interno) Devuelve los motores para buscar (el de caracteres y el de
+        bytes). Con el motor afd, el AFD de Σ*·L puede ser mucho más grande
+        que el de L, así que sólo lo armamos la primera vez que se busca. Si
+        supera max_afd_states, buscamos simulando el AFND.
+        """
+        if self._motor_search is None:
+            with self._lock:
+                # Otro thread pudo haberlos armado mientras esperábamos el lock
+                if self._motor_search is None:
+                    self._build_searchers()
+        return self._motor_search, self._motor_search_bytes
+
+    def _build_searchers(self):
+        """(Interno) Arma los motores para buscar. Se llama con el lock tomado (ver _searchers)."""
+        afnd_bytes = self._afnd.to_bytes()
+        try:
+            afd = self._afnd.unanchored().determinize(max_states=self.max_afd_states).minimize()
+            # El Σ* tiene que ser de bytes: si fuera de caracteres, un byte
+            # que aparece en otro carácter (como el A9 de é = C3 A9 dentro
+            # de Ω = CE A9) no volvería al estado inicial
+            afd_bytes = afnd_bytes.unanchored().determinize(max_states=self.max_afd_states).minimize()
+        except StateLimitExceeded:
+            self._stats["search_fallback"] = True
+            motor, motor_bytes = self._afnd, afnd_bytes
+        else:
+            motor, motor_bytes = TablaAFD(afd, search=True), TablaAFD(afd_bytes, search=True)
+
+        # _motor_search va último: _searchers sólo mira ese para saber si ya están
+        object.__setattr__(self, "_motor_search_bytes", motor_bytes)
+        object.__setattr__(self, "_motor_search", motor)
+
+    def prepare_search(self):
+        """
+        Arma los motores para buscar, si todavía no están. Sirve para armarlos
+        una sola vez antes de mandar la expresión a otros procesos.
+        """
+        self._searchers()
+
+    def stats(self) -> dict:
+        """
+        Devuelve cómo se compiló la expresión: el motor pedido y el usado, la
+        cantidad máxima de estados del AFD, cuántos estados tienen el AFND y
+        el AFD (None si no se armó), y si se superó el máximo al compilar
+        (fallback) o al armar el AFD para buscar (search_fallback).
+        """
+        return {"engine": self.engine, "max_afd_states": self.max_afd_states, **self._stats}
+
+    def match(self, word: str, stats: Optional[PrefilterStats] = None) -> bool:
+        """
+        Indica si la expresión regular acepta la cadena completa. Si se indica
+        stats, se cuenta ahí si el prefiltro revisó y descartó la cadena.
+        """
+        prefilter = self.prefilter
+        if prefilter is not None:
+            descartada = prefilter.rejects(word)
+            if stats is not None:
+                stats.add(1, descartada)
+            if descartada:
+                return False
+        return self._motor.accept_string(word)
+
+    def match_bytes(self, data: bytes, end: Optional[int] = None, stats: Optional[PrefilterStats] = None) -> bool:
+        """
+        Indica si la expresión regular acepta data[:end], interpretado como
+        texto en UTF-8. No decodifica ni copia los bytes. Si se indica stats,
+        se cuenta ahí si el prefiltro revisó y descartó los bytes.
+        """
+        # Los memoryviews no tienen find: a esos los prefiltra quien los arma
+        # (ver scan.matching_lines), buscando sobre el buffer original
+        prefilter = self.prefilter
+        if prefilter is not None and type(data) is not memoryview:
+            descartada = prefilter.rejects_bytes(data, 0, end)
+            if stats is not None:
+                stats.add(1, descartada)
+            if descartada:
+                return False
+        return self._motor_bytes.accept_bytes(data, end)
+
+    def search(self, word: str, stats: Optional[PrefilterStats] = None) -> Optional[int]:
+        """
+        Busca la expresión regular dentro de la cadena. Devuelve la posición
+        donde termina la primera ocurrencia (la que termina antes), o None si
+        no hay ninguna. Los stats se cuentan como en match.
+        """
+        prefilter = self.prefilter
+        if prefilter is not None:
+            descartada = prefilter.rejects(word)
+            if stats is not None:
+                stats.add(1, descartada)
+            if descartada:
+                return None
+        return self._searchers()[0].search_string(word)
+
+    def search_bytes(self, data: bytes, end: Optional[int] = None,
+                     stats: Optional[PrefilterStats] = None) -> Optional[int]:
+        """
+        Como search, pero sobre data[:end] interpretado como texto en UTF-8.
+        La posición que se devuelve se cuenta en bytes.
+        """
+        prefilter = self.prefilter
+        if prefilter is not None and type(data) is not memoryview:
+            descartada = prefilter.rejects_bytes(data, 0, end)
+            if stats is not None:
+                stats.add(1, descartada)
+            if descartada:
+                return None
+        return self._searchers()[1].search_bytes(data, end)
+
+    def count(self, words: Iterable[str]) -> int:
+        """Cuenta cuántas de las cadenas son aceptadas."""
+        match = self.match
+        return sum(1 for word in words if match(word))
+
+    def match_all(self, words: Iterable[str]) -> list[bool]:
+        """Indica, para cada cadena, si es aceptada."""
+        match = self.match
+        return [match(word) for word in words]
+
+    def filter(self, words: Iterable[str]) -> Iterator[str]:
+        """Devuelve las cadenas aceptadas, en el orden original."""
+        match = self.match
+        return (word for word in words if match(word))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.pattern!r}, engine={self.engine!r})"
@@ -0,0 +1,193 @@
+from typing import Hashable, Optional
+
+from regex import RegEx, Empty, Lambda, Char, CharClass, Union, Concat, Star, Plus, Repeat
+from regex.simplify import union, concat, repeat
+
+__all__ = ["DerivativeMatcher", "derivative", "nullable"]
+
+
+def nullable(exp: RegEx) -> bool:
+    """Indica si la expresión regular acepta λ."""
+    if isinstance(exp, (Lambda, Star)):
+        return True
+    if isinstance(exp, (Empty, Char, CharClass)):
+        return False
+    if isinstance(exp, Concat):
+        return all(nullable(e) for e in exp.exps)
+    if isinstance(exp, Union):
+        return any(nullable(e) for e in exp.exps)
+    if isinstance(exp, Plus):
+        return nullable(exp.exp)
+    if isinstance(exp, Repeat):
+        return exp.min == 0 or nullable(exp.exp)
+    raise ValueError(f"Expresión regular desconocida: {exp}.")
+
+
+def derivative(exp: RegEx, a: str) -> RegEx:
+    """
+    Devuelve la derivada de Brzozowski de la expresión respecto de a: la
+    expresión que acepta las cadenas w tales que la original acepta aw.
+
+    El resultado se arma con los constructores de regex.simplify, y las
+    uniones quedan ordenadas, así que derivadas equivalentes por asociatividad,
+    conmutatividad e idempotencia de la unión quedan iguales (con la misma
+    clave). Por eso, derivando siempre se llega a finitas expresiones distintas.
+    """
+    if isinstance(exp, (Empty, Lambda)):
+        return Empty()
+    if isinstance(exp, Char):
+        return Lambda() if a == exp.char else Empty()
+    if isinstance(exp, CharClass):
+        return Lambda() if a in exp.chars else Empty()
+    if isinstance(exp, Concat):
+        # d(rs) = d(r)s | d(s) si r acepta λ
+        ramas = []
+        for k, e in enumerate(exp.exps):
+            ramas.append(concat(derivative(e, a), *exp.exps[k + 1:]))
+            if not nullable(e):
+                break
+        return _union_ordenada(ramas)
+    if isinstance(exp, Union):
+        return _union_ordenada([derivative(e, a) for e in exp.exps])
+    if isinstance(exp, Star):
+        return concat(derivative(exp.exp, a), exp)
+    if isinstance(exp, Plus):
+        return concat(derivative(exp.exp, a), Star(exp.exp))
+    if isinstance(exp, Repeat):
+        # r{0} = λ, así que su derivada es vacía
+        if exp.max == 0:
+            return Empty()
+        # Si la expresión acepta λ, las repeticiones obligatorias pueden ser vacías
+        minimo = 0 if nullable(exp.exp) else exp.min - 1
+        return concat(derivative(exp.exp, a), repeat(exp.exp, max(minimo, 0), exp.max - 1))
+    raise ValueError(f"Expresión regular desconocida: {exp}.")
+
+
+def _union_ordenada(exps: list) -> RegEx:
+    """(Interno) Devuelve la unión simplificada de las expresiones, con las ramas ordenadas."""
+    exp = union(*exps)
+    if isinstance(exp, Union):
+        exp = Union(*sorted(exp.exps, key=lambda e: repr(e._key())))
+    return exp
+
+
+class DerivativeMatcher:
+    """
+    Matchea con derivadas de Brzozowski, sin armar ningún autómata.
+
+    Cada estado es una expresión regular (identificada por su clave), y leer
+    el carácter a es pasar a su derivada respecto de a. Las derivadas se
+    guardan a medida que se calculan, así que se va armando un AFD sólo con
+    los estados y transiciones que la entrada necesita. El cache tiene a lo
+    sumo max_states estados; cuando se llena, se vacía entero (como en
+    AFDLazy).
+
+    Si unanchored es True, busca ocurrencias de la expresión en cualquier
+    posición: después de cada carácter, el estado vuelve a incluir a la
+    expresión original.
+    """
+
+    def __init__(self, regex: RegEx, max_states: int = 10000, unanchored: bool = False):
+        if max_states < 1:
+            raise ValueError(f"La cantidad máxima de estados debe ser positiva (recibimos {max_states}).")
+        self.regex = regex
+        self.max_states = max_states
+        self.unanchored = unanchored
+        self.flushes = 0
+
+        self.initial = regex._key()
+        self._vacio = Empty()._key()
+        self._expresiones = {self.initial: regex} # _expresiones[<clave>] = <expresión>
+        self._cache = {}                          # _cache[<clave>][<carácter>] = <clave>
+        self._finales = {}                        # _finales[<clave>] = <¿acepta λ?>
+
+    def accept_string(self, word: str) -> bool:
+        """Verifica si la cadena word es aceptada por la expresión."""
+        q = self.initial
+        cache = self._cache
+
+        for a in word:
+            try:
+                q = cache[q][a]
+            except KeyError:
+                q = self._derive(q, a)
+                cache = self._cache
+            if q == self._vacio:
+                return False
+
+        return self._is_final(q)
+
+    def accept_bytes(self, data: bytes, end: Optional[int] = None) -> bool:
+        """
+        Verifica si los bytes data[:end] son aceptados. Las derivadas se
+        calculan sobre caracteres, así que los bytes se decodifican.
+        """
+        return self.accept_string(self._decode(data, end))
+
+    def search_string(self, word: str) -> Optional[int]:
+        """
+        Devuelve la posición donde termina la primera ocurrencia de la
+        expresión dentro de word, o None si no hay ninguna.
+        Sólo tiene sentido si el matcher es unanchored.
+        """
+        q = self.initial
+        if self._is_final(q):
+            return 0
+
+        cache = self._cache
+        for i, a in enumerate(word):
+            try:
+                q = cache[q][a]
+            except KeyError:
+                q = self._derive(q, a)
+                cache = self._cache
+            if self._is_final(q):
+                return i + 1
+
+        return None
+
+    def search_bytes(self, data: bytes, end: Optional[int] = None) -> Optional[int]:
+        """Como search_string, pero sobre los bytes data[:end] (la posición se cuenta en bytes)."""
+        word = self._decode(data, end)
+        fin = self.search_string(word)
+        if fin is None:
+            return None
+        return len(word[:fin].encode("utf-8", "surrogateescape"))
+
+    def size(self) -> int:
+        """Devuelve la cantidad de estados (expresiones) guardados en el cache."""
+        return len(self._cache)
+
+    def _derive(self, q: Hashable, a: str) -> Hashable:
+        """(Interno) Calcula la derivada del estado q respecto de a, y la guarda en el cache."""
+
+        if q not in self._cache:
+            # Si el cache está lleno, lo vaciamos (salvo el estado inicial)
+            if len(self._cache) >= self.max_states:
+                self._cache = {}
+                self._finales = {}
+                self._expresiones = {self.initial: self.regex, q: self._expresiones[q]}
+                self.flushes += 1
+            self._cache[q] = {}
+
+        exp = derivative(self._expresiones[q], a)
+        if self.unanchored:
+            exp = _union_ordenada([exp, self.regex])
+
+        p = exp._key()
+        self._expresiones.setdefault(p, exp)
+        self._cache[q][a] = p
+        return p
+
+    def _is_final(self, q: Hashable) -> bool:
+        """(Interno) Indica si el estado q acepta λ."""
+        try:
+            return self._finales[q]
+        except KeyError:
+            final = self._finales[q] = nullable(self._expresiones[q])
+            return final
+
+    @staticmethod
+    def _decode(data: bytes, end: Optional[int]) -> str:
+        """(Interno) Decodifica data[:end] (los bytes inválidos no matchean con ningún carácter)."""
+        return bytes(data if end is None else data[:end]).decode("utf-8", "surrogateescape")
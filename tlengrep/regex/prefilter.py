@@ -0,0 +1,59 @@
+from typing import Optional
+
+__all__ = ["Prefilter", "PrefilterStats"]
+
+
+class Prefilter:
+    """
+    Descarta rápido las cadenas que no pueden matchear: toda cadena aceptada
+    por la expresión regular contiene el literal (ver RegEx.required_literal),
+    así que si no aparece, no hace falta correr el autómata. Buscar el
+    literal con str.find/bytes.find es mucho más rápido que recorrer la
+    cadena carácter por carácter.
+
+    No guarda estado, así que se puede compartir entre threads (como la
+    CompiledRegex que lo usa). Quien quiera saber cuántas cadenas se
+    descartaron lo cuenta con un PrefilterStats.
+    """
+
+    def __init__(self, literal: str):
+        if not literal:
+            raise ValueError("El literal del prefiltro no puede ser vacío.")
+        self.literal = literal
+        self.literal_bytes = literal.encode("utf-8")
+
+    def rejects(self, word: str) -> bool:
+        """Indica si la cadena se puede descartar (no contiene el literal)."""
+        return self.literal not in word
+
+    def rejects_bytes(self, data: bytes, start: int = 0, end: Optional[int] = None) -> bool:
+        """
+        Indica si los bytes data[start:end] se pueden descartar. Sirve para
+        cualquier buffer con find (bytes, bytearray, mmap), sin copiarlo.
+        """
+        return data.find(self.literal_bytes, start, end) == -1
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.literal!r})"
+
+
+class PrefilterStats:
+    """
+    Cuenta cuántas cadenas revisó y cuántas descartó un prefiltro durante un
+    recorrido (ver scan.matching_lines). Cada recorrido lleva su propia
+    cuenta, y las de varios procesos se suman con add.
+    """
+
+    def __init__(self, literal: str):
+        self.literal = literal
+        self.checked = 0
+        self.rejected = 0
+
+    def add(self, checked: int, rejected: int):
+        """Suma cadenas revisadas y descartadas a la cuenta."""
+        self.checked += checked
+        self.rejected += rejected
+
+    def stats(self) -> dict:
+        """Devuelve el literal y cuántas cadenas se revisaron y descartaron."""
+        return {"literal": self.literal, "checked": self.checked, "rejected": self.rejected}
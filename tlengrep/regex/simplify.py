@@ -0,0 +1,139 @@
+from typing import Iterable
+
+from regex import RegEx, Empty, Lambda, Char, CharClass, Union, Concat, Star, Plus, Repeat
+
+__all__ = ["char_class", "union", "concat", "star", "plus", "optional", "repeat"]
+
+# Constructores que simplifican la expresión mientras la arman. Devuelven
+# una RegEx que acepta el mismo lenguaje que el nodo correspondiente, pero
+# con menos nodos (y, por lo tanto, un AFND más chico). El parser los usa en
+# vez de instanciar los nodos directamente.
+
+
+def char_class(chars: Iterable[str]) -> RegEx:
+    """Devuelve la expresión de un conjunto de caracteres: [] = ∅ y [a] = a."""
+    chars = frozenset(chars)
+    if not chars:
+        return Empty()
+    if len(chars) == 1:
+        return Char(next(iter(chars)))
+    return CharClass(chars)
+
+
+def union(*exps: RegEx) -> RegEx:
+    """
+    Devuelve la unión de las expresiones:
+    - Las uniones anidadas se aplanan: (r|s)|t = r|s|t.
+    - Se sacan las ramas vacías y las repetidas: ∅|r = r y r|r = r.
+    - Las ramas que son caracteres se juntan en un solo CharClass: a|[bc] = [abc].
+    """
+    ramas = []
+    vistas = set()
+    chars = set()
+    primer_char = None
+
+    pendientes = list(reversed(exps))
+    while pendientes:
+        exp = pendientes.pop()
+        if isinstance(exp, Union):
+            pendientes.extend(reversed(exp.exps))
+        elif isinstance(exp, Empty):
+            continue
+        elif isinstance(exp, (Char, CharClass)):
+            # Guardamos el lugar de la primer rama de caracteres
+            if primer_char is None:
+                primer_char = len(ramas)
+                ramas.append(None)
+            chars |= {exp.char} if isinstance(exp, Char) else exp.chars
+        elif exp._key() not in vistas:
+            vistas.add(exp._key())
+            ramas.append(exp)
+
+    if primer_char is not None:
+        ramas[primer_char] = char_class(chars)
+
+    if not ramas:
+        return Empty()
+    if len(ramas) == 1:
+        return ramas[0]
+    return Union(*ramas)
+
+
+def concat(*exps: RegEx) -> RegEx:
+    """
+    Devuelve la concatenación de las expresiones:
+    - Las concatenaciones anidadas se aplanan: (rs)t = rst.
+    - Se sacan los λ: λr = rλ = r.
+    - Si alguna es vacía, el resultado es vacío: ∅r = ∅.
+    """
+    partes = []
+
+    pendientes = list(reversed(exps))
+    while pendientes:
+        exp = pendientes.pop()
+        if isinstance(exp, Concat):
+            pendientes.extend(reversed(exp.exps))
+        elif isinstance(exp, Empty):
+            return Empty()
+        elif not isinstance(exp, Lambda):
+            partes.append(exp)
+
+    if not partes:
+        return Lambda()
+    if len(partes) == 1:
+        return partes[0]
+    return Concat(*partes)
+
+
+def _sin_lambda(exp: RegEx) -> RegEx:
+    """
+    (Interno) Saca λ de una unión, para las expresiones en las que da igual:
+    (r|λ)* = r*. Si no hay nada que sacar, devuelve la misma expresión.
+    """
+    if isinstance(exp, Union) and any(isinstance(rama, Lambda) for rama in exp.exps):
+        return union(*(rama for rama in exp.exps if not isinstance(rama, Lambda)))
+    if isinstance(exp, Repeat) and exp.min == 0 and exp.max == 1:
+        return exp.exp
+    return exp
+
+
+def star(exp: RegEx) -> RegEx:
+    """Devuelve la clausura de Kleene: r** = r+* = r*, ∅* = λ* = λ y (r|λ)* = r*."""
+    exp = _sin_lambda(exp)
+    if isinstance(exp, (Empty, Lambda)):
+        return Lambda()
+    if isinstance(exp, (Star, Plus)):
+        return Star(exp.exp)
+    return Star(exp)
+
+
+def plus(exp: RegEx) -> RegEx:
+    """Devuelve la clausura positiva: r++ = r+, r*+ = r*, ∅+ = ∅, λ+ = λ y (r|λ)+ = r*."""
+    if isinstance(exp, (Empty, Lambda, Star, Plus)):
+        return exp
+    sin_lambda = _sin_lambda(exp)
+    if sin_lambda is not exp:
+        return star(sin_lambda)
+    return Plus(exp)
+
+
+def optional(exp: RegEx) -> RegEx:
+    """Devuelve r? = r|λ, salvo que r ya acepte λ: r*? = r* y r+? = r*."""
+    if isinstance(exp, (Lambda, Star)):
+        return exp
+    if isinstance(exp, Plus):
+        return Star(exp.exp)
+    if isinstance(exp, Empty):
+        return Lambda()
+    return union(exp, Lambda())
+
+
+def repeat(exp: RegEx, min: int, max: int) -> RegEx:
+    """Devuelve exp{min,max}: r{0} = λ, r{1} = r, λ{n,m} = λ y ∅{n,m} = ∅ (si n > 0)."""
+    if max == 0 or isinstance(exp, Lambda):
+        return Lambda()
+    if isinstance(exp, Empty):
+        return Empty() if min > 0 else Lambda()
+    if min == max == 1:
+        return exp
+    return Repeat(exp, min, max)
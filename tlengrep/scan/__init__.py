@@ -0,0 +1,198 @@
+import mmap
+import os
+from multiprocessing import Pool
+from typing import BinaryIO, Callable, Iterator, Optional, TextIO, Union
+
+from regex import CompiledRegex, Prefilter, PrefilterStats
+
+__all__ = ["OutputBuffer", "line_matcher", "matching_lines", "scan_mmap", "split_file", "scan_parallel"]
+
+
+class OutputBuffer:
+    """
+    Junta lo que se escribe y lo manda a output de a bloques de (al menos)
+    size caracteres o bytes, en vez de hacer una escritura por línea.
+
+    Con line_buffered, cada escritura se manda (y se flushea) enseguida, por
+    ejemplo para ver los resultados a medida que aparecen en un `tail -f`.
+    """
+
+    def __init__(self, output: Union[BinaryIO, TextIO], size: int = 1 << 16, line_buffered: bool = False):
+        if size < 1:
+            raise ValueError(f"El tamaño del buffer debe ser positivo (recibimos {size}).")
+        self.output = output
+        self.size = size
+        self.line_buffered = line_buffered
+        self._pedazos = []
+        self._pendiente = 0
+
+    def write(self, data):
+        """Agrega data al buffer, y lo vacía si se llenó."""
+        if self.line_buffered:
+            self.output.write(data)
+            self.output.flush()
+            return
+        self._pedazos.append(data)
+        self._pendiente += len(data)
+        if self._pendiente >= self.size:
+            self.flush()
+
+    def flush(self):
+        """Escribe todo lo que quedó en el buffer."""
+        if self._pedazos:
+            vacio = "" if isinstance(self._pedazos[0], str) else b""
+            self.output.write(vacio.join(self._pedazos))
+            self._pedazos.clear()
+            self._pendiente = 0
+        self.output.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def matching_lines(data: bytes, match_bytes: Callable, prefilter: Optional[Prefilter] = None,
+                   stats: Optional[PrefilterStats] = None) -> Iterator[tuple[int, int]]:
+    """
+    Recorre las líneas de data y devuelve el comienzo y el fin (incluyendo el
+    salto de línea) de las que matchean. Cada línea se le pasa a match_bytes
+    como un memoryview, sin copiarla. Si hay un prefiltro, las líneas que
+    descarta (buscando directamente en data) no llegan a match_bytes, y si
+    se indica stats, se suman ahí las líneas revisadas y descartadas.
+    """
+    find = data.find
+    n = len(data)
+    i = 0
+    revisadas = descartadas = 0
+
+    try:
+        with memoryview(data) as view:
+            while i < n:
+                j = find(b"\n", i)
+                if j == -1:
+                    j = stop = n
+                else:
+                    stop = j + 1
+                if prefilter is not None:
+                    revisadas += 1
+                    if prefilter.rejects_bytes(data, i, j):
+                        descartadas += 1
+                        i = stop
+                        continue
+                if match_bytes(view[i:j]):
+                    yield i, stop
+                i = stop
+    finally:
+        if stats is not None:
+            stats.add(revisadas, descartadas)
+
+
+def line_matcher(compiled: CompiledRegex, search: bool = False) -> Callable:
+    """
+    Devuelve la función que decide si una línea (en bytes) se imprime: si
+    la expresión acepta la línea completa o, con search, si aparece en ella.
+    """
+    if not search:
+        return compiled.match_bytes
+    search_bytes = compiled.search_bytes
+    return lambda line: search_bytes(line) is not None
+
+
+def scan_mmap(path: str, compiled: CompiledRegex, output: BinaryIO, search: bool = False,
+              stats: Optional[PrefilterStats] = None):
+    """
+    Escribe en output las líneas del archivo que matchean, leyéndolo con mmap:
+    las líneas se buscan y se matchean sobre el archivo mapeado en memoria, y
+    se escriben como memoryviews, sin copiarlas. Con search, se escriben las
+    líneas en las que aparece la expresión. Si se indica stats, se cuentan
+    ahí las líneas que descartó el prefiltro.
+    """
+    with open(path, "rb") as f:
+        # No se puede mapear un archivo vacío (y tampoco hay nada que buscar)
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with memoryview(data) as view:
+                for i, j in matching_lines(data, line_matcher(compiled, search), compiled.prefilter, stats):
+                    output.write(view[i:j])
+                # Si output guarda las líneas (ver OutputBuffer), tiene que
+                # escribirlas antes de que se cierre el mmap
+                output.flush()
+
+
+def split_file(path: str, n_chunks: int) -> list[tuple[int, int]]:
+    """
+    Divide el archivo en (a lo sumo) n_chunks rangos de bytes [inicio, fin)
+    de tamaño parecido, cortando siempre después de un salto de línea.
+    """
+    size = os.path.getsize(path)
+    step = max(1, -(-size // n_chunks))
+
+    cortes = [0]
+    with open(path, "rb") as f:
+        for corte in range(step, size, step):
+            if corte <= cortes[-1]:
+                continue
+            # Avanzamos hasta el final de la línea en la que cae el corte
+            f.seek(corte - 1)
+            f.readline()
+            if f.tell() >= size:
+                break
+            cortes.append(f.tell())
+    cortes.append(size)
+
+    return [(inicio, fin) for inicio, fin in zip(cortes, cortes[1:]) if inicio < fin]
+
+
+# La función que decide qué líneas se imprimen en cada proceso del pool, y
+# su prefiltro (la expresión compilada se recibe una sola vez)
+_matcher = None
+_prefilter = None
+
+
+def _init_worker(compiled: CompiledRegex, search: bool):
+    """(Interno) Guarda la expresión compilada en el proceso del pool."""
+    global _matcher, _prefilter
+    _matcher = line_matcher(compiled, search)
+    _prefilter = compiled.prefilter
+
+
+def _scan_chunk(chunk: tuple[str, int, int]) -> tuple[bytes, int, int]:
+    """
+    (Interno) Devuelve las líneas que matchean dentro de un rango de bytes del
+    archivo, y cuántas revisó y descartó el prefiltro.
+    """
+    path, inicio, fin = chunk
+    with open(path, "rb") as f:
+        f.seek(inicio)
+        data = f.read(fin - inicio)
+    stats = PrefilterStats(_prefilter.literal if _prefilter is not None else "")
+    lines = b"".join(data[i:j] for i, j in matching_lines(data, _matcher, _prefilter, stats))
+    return lines, stats.checked, stats.rejected
+
+
+def scan_parallel(path: str, compiled: CompiledRegex, jobs: int, output: BinaryIO, search: bool = False,
+                  stats: Optional[PrefilterStats] = None):
+    """
+    Escribe en output las líneas del archivo que matchean (o, con search, en
+    las que aparece la expresión), repartiendo el trabajo entre jobs procesos.
+    Las líneas salen en el orden original. Si se indica stats, se suman ahí
+    las líneas que revisó y descartó el prefiltro en cada proceso.
+    """
+
+    # Los motores para buscar se arman la primera vez que se usan: los armamos
+    # acá, así no los arma cada proceso por su cuenta
+    if search:
+        compiled.prepare_search()
+
+    # Usamos varios rangos por proceso, para que ninguno quede esperando al final
+    chunks = split_file(path, jobs * 4)
+
+    with Pool(jobs, initializer=_init_worker, initargs=(compiled, search)) as pool:
+        rangos = [(path, inicio, fin) for inicio, fin in chunks]
+        for lines, revisadas, descartadas in pool.imap(_scan_chunk, rangos):
+            output.write(lines)
+            if stats is not None:
+                stats.add(revisadas, descartadas)
@@ -0,0 +1,8 @@
+from regex import Char, CharClass, Concat, Plus
+
+# [0-9]+x
+__regex__ = Concat(Plus(CharClass("0123456789")), Char('x'))
+
+__should_match__ = r"[0-9]+x"
+
+__min_afd_size__ = 4
@@ -0,0 +1,8 @@
+from regex import Char, Concat, Repeat, Union
+
+# ((ab){1,3}|c{2})c
+__regex__ = Concat(Union(Repeat(Concat(Char('a'), Char('b')), 1, 3), Repeat(Char('c'), 2, 2)), Char('c'))
+
+__should_match__ = r"((ab){1,3}|c{2})c"
+
+__min_afd_size__ = 10
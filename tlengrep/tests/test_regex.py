@@ -3,6 +3,12 @@ import glob
 import importlib
 import pytest
 import re
+import time
+from threading import Thread
+
+from automata import AFD, AFDLazy, AFND, BitParallelNFA, StateLimitExceeded, TablaAFD
+from regex import Char, CharClass, Concat, Plus, Repeat, Star, Union, RegEx, CacheLRU, CompiledRegex, CONSTRUCTIONS, ENGINES, PrefilterStats, afd_cache
+from regex.derivatives import DerivativeMatcher, derivative, nullable
 
 # Setup: Genera los casos de test a partir de los archivos en tests/regexes/*.py
 case_names = [
@@ -39,10 +45,469 @@ class TestRegex:
             assert does_match == should_match, f"La regex '{case['regex']}' {'no acepta' if should_match else 'acepta'} la cadena '{string}'"
 
     @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
-    def test_min_afd_size(self, case):
+    def test_naive_match(self, case, strings):
+        '''La implementación naive acepta las cadenas correctas'''
+        regex = case["regex"]
+        for string in strings:
+            assert regex.naive_match(string) == should_match(case, string), f"La regex '{regex}' con la cadena '{string}'"
+
+    def test_naive_match_long_string(self):
+        '''La implementación naive es polinomial (probar todos los cortes sería exponencial)'''
+        regex = Concat(Star(Union(Char("a"), Concat(Char("a"), Char("a")))), Char("b"))
+        assert not regex.naive_match("a" * 2000)
+        assert regex.naive_match("a" * 2000 + "b")
+        assert Repeat(Star(Char("a")), 3, 5).naive_match("a" * 500)
+
+    @pytest.mark.parametrize("construction", CONSTRUCTIONS)
+    @pytest.mark.parametrize("algorithm", ["hopcroft", "moore"])
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_min_afd_size(self, case, algorithm, construction):
         '''El tamaño del AFD mínimo es el esperado'''
         regex = case["regex"]
         expected_min_afnd_size = case["min_afnd_size"]
-        actual_min_afnd_size = regex.to_afnd().determinize().minimize().size()
+        actual_min_afnd_size = regex.to_afnd(construction).determinize().minimize(algorithm).size()
         assert actual_min_afnd_size == expected_min_afnd_size, f"El AFD mínimo de la regex '{regex}' debería tener {expected_min_afnd_size} estados pero tiene {actual_min_afnd_size}"
 
+
+def count_chars(regex):
+    '''Cuenta las apariciones de caracteres en la regex'''
+    if isinstance(regex, (Char, CharClass)):
+        return 1
+    if isinstance(regex, Repeat):
+        return regex.max * count_chars(regex.exp)
+    if isinstance(regex, (Concat, Union)):
+        return sum(count_chars(child) for child in regex.exps)
+    return sum(count_chars(child) for child in vars(regex).values() if isinstance(child, RegEx))
+
+
+def fresh_regex(case_name):
+    '''Devuelve una instancia nueva (nunca compilada) de la RegEx del caso'''
+    return importlib.reload(importlib.import_module(f"tests.regexes.{case_name}")).__regex__
+
+
+class TestCache:
+
+    def test_lru_eviction(self):
+        '''Se desaloja la entrada usada hace más tiempo'''
+        cache = CacheLRU(capacity=2)
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        cache.get("a", lambda: 1)
+        cache.get("c", lambda: 3)
+        assert "a" in cache and "c" in cache and "b" not in cache
+        assert cache.stats() == {"capacity": 2, "size": 2, "hits": 1, "misses": 3, "evictions": 1}
+
+    def test_clear(self):
+        '''clear() vacía el cache y reinicia los contadores'''
+        cache = CacheLRU(capacity=2)
+        cache.get("a", lambda: 1)
+        cache.clear()
+        assert len(cache) == 0 and cache.stats()["misses"] == 0
+
+    def test_alternating_patterns(self):
+        '''Alternar entre dos RegEx no recompila sus autómatas'''
+        afd_cache.clear()
+        for _ in range(3):
+            fresh_regex("r00").match("a")
+            fresh_regex("r01").match("a")
+        assert afd_cache.stats()["misses"] == 2
+
+    def test_afd_kept_in_node(self):
+        '''Una vez compilada, la RegEx no vuelve a consultar el cache'''
+        regex = fresh_regex("r02")
+        regex.match("a")
+        hits = afd_cache.stats()["hits"]
+        for _ in range(3):
+            regex.match("a")
+        assert afd_cache.stats()["hits"] == hits
+
+
+def should_match(case, string):
+    '''Indica si la regex del caso debería aceptar la cadena'''
+    if type(case["should_match"]) is str:
+        return re.fullmatch(case["should_match"], string) is not None
+    return case["should_match"](string)
+
+
+def first_match_end(pattern, string):
+    '''Posición donde termina la primera ocurrencia de pattern en string (o None)'''
+    for end in range(len(string) + 1):
+        for start in range(end + 1):
+            if re.fullmatch(pattern, string[start:end]) is not None:
+                return end
+    return None
+
+
+@pytest.mark.parametrize("construction", CONSTRUCTIONS)
+@pytest.mark.parametrize("engine", ENGINES)
+class TestCompiled:
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_compiled_match(self, case, strings, engine, construction):
+        '''La RegEx compilada acepta las cadenas correctas'''
+        compiled = case["regex"].compile(engine, construction)
+        expected = [should_match(case, string) for string in strings]
+        assert compiled.match_all(strings) == expected
+        assert list(compiled.filter(strings)) == [string for string, ok in zip(strings, expected) if ok]
+        assert compiled.count(strings) == sum(expected)
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_match_bytes(self, case, strings, engine, construction):
+        '''En modo bytes se aceptan las cadenas correctas (con o sin salto de línea)'''
+        compiled = case["regex"].compile(engine, construction)
+        for string in strings:
+            line = (string + "\n").encode("utf-8")
+            assert compiled.match_bytes(string.encode("utf-8")) == should_match(case, string)
+            assert compiled.match_bytes(line, len(line) - 1) == should_match(case, string)
+
+    @pytest.mark.parametrize("case", [case for case in cases if type(case["should_match"]) is str],
+                             ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_search(self, case, strings, engine, construction):
+        '''search() encuentra el final de la primera ocurrencia'''
+        compiled = case["regex"].compile(engine, construction)
+        for string in strings:
+            expected = first_match_end(case["should_match"], string)
+            assert compiled.search(string) == expected, f"La regex '{case['regex']}' en la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", [case for case in cases if type(case["should_match"]) is str],
+                             ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_search_bytes(self, case, strings, engine, construction):
+        '''search_bytes() encuentra el final (en bytes) de la primera ocurrencia'''
+        compiled = case["regex"].compile(engine, construction)
+        for string in strings:
+            expected = first_match_end(case["should_match"], string)
+            if expected is not None:
+                expected = len(string[:expected].encode("utf-8"))
+            line = (string + "\n").encode("utf-8")
+            assert compiled.search_bytes(line, len(line) - 1) == expected, f"La regex '{case['regex']}' en la cadena '{string}'"
+
+    def test_searchers_built_once(self, engine, construction, monkeypatch):
+        '''Si varios threads buscan a la vez, los motores para buscar se arman una sola vez'''
+        compiled = CompiledRegex.build(cases[0]["regex"], engine, construction)
+        unanchored = AFND.unanchored
+        llamadas = []
+
+        def contar(afnd):
+            llamadas.append(afnd)
+            time.sleep(0.01)
+            return unanchored(afnd)
+
+        monkeypatch.setattr(AFND, "unanchored", contar)
+        threads = [Thread(target=compiled.search, args=("",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(llamadas) <= 2  # El AFD de caracteres y el de bytes
+
+    def test_search_bytes_non_ascii(self, engine, construction):
+        '''search_bytes() vuelve a empezar en bytes que comparte otro carácter (Ω = CE A9, é = C3 A9)'''
+        compiled = CharClass("éê").compile(engine, construction)
+        assert compiled.search_bytes("Ωé".encode("utf-8")) == 4
+        assert compiled.search_bytes("xΩΩê\n".encode("utf-8"), 7) == 7
+        assert compiled.search_bytes("Ωxe".encode("utf-8")) is None
+
+    def test_immutable(self, engine, construction):
+        '''La RegEx compilada no se puede modificar'''
+        compiled = cases[0]["regex"].compile(engine, construction)
+        with pytest.raises(AttributeError):
+            compiled.pattern = "otra"
+
+
+class TestPrefilter:
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_required_literal(self, case, strings):
+        '''Toda cadena aceptada contiene el literal obligatorio'''
+        literal = case["regex"].required_literal()
+        for string in strings:
+            if should_match(case, string):
+                assert literal in string
+
+    def test_literal_across_concat(self):
+        '''El literal puede cruzar concatenaciones y salir de las dos ramas de una unión'''
+        digit = Union(Char("0"), Char("1"))
+        regex = Concat(Concat(Star(digit), Concat(Char("a"), Char("b"))),
+                       Concat(Union(Concat(Char("c"), Char("x")), Concat(Char("c"), Char("y"))), Plus(digit)))
+        assert regex.required_literal() == "abc"
+
+    def test_prefilter(self):
+        '''Las cadenas sin el literal se descartan, y la expresión compilada no guarda ninguna cuenta'''
+        compiled = cases[19]["regex"].compile()
+        assert compiled.prefilter.literal == "ab"
+        assert compiled.match_all(["abab", "ba", "aab", ""]) == [True, False, False, False]
+        assert compiled.match_bytes(b"bbbb") is False
+        assert compiled.prefilter.rejects("ba") and not compiled.prefilter.rejects_bytes(b"xxab", 1)
+        assert not hasattr(compiled.prefilter, "checked")
+
+    def test_prefilter_stats(self):
+        '''Los métodos de la expresión compilada cuentan en stats lo que revisa y descarta el prefiltro'''
+        compiled = cases[19]["regex"].compile()
+        stats = PrefilterStats("ab")
+        assert [compiled.match(word, stats) for word in ["abab", "ba", "aab"]] == [True, False, False]
+        assert compiled.match_bytes(b"bbbb", None, stats) is False
+        assert compiled.search("xxab", stats) is not None and compiled.search_bytes(b"ba", None, stats) is None
+        assert stats.stats() == {"literal": "ab", "checked": 6, "rejected": 3}
+
+
+class TestAFDLazy:
+
+    def test_bounded_cache(self):
+        '''Si el cache se llena, se vacía y se sigue matcheando bien'''
+        regex = cases[33]["regex"]
+        lazy = AFDLazy(regex.to_afnd(), max_states=2)
+        for string in ["abcabca", "aaaccc", "abcb", "cb"]:
+            assert lazy.accept_string(string) == should_match(cases[33], string)
+        assert lazy.flushes > 0 and lazy.size() <= 2
+
+
+class TestDerivatives:
+
+    def test_derivative(self):
+        '''Las derivadas se simplifican'''
+        a, b = Char("a"), Char("b")
+        assert str(derivative(Concat(a, b), "a")) == "b"
+        assert str(derivative(Concat(Star(a), b), "a")) == "(a*)b"
+        assert str(derivative(Concat(Star(a), b), "b")) == "λ"
+        assert str(derivative(Repeat(a, 2, 3), "a")) == "a{1,2}"
+        assert nullable(Repeat(Star(a), 2, 3)) and not nullable(Plus(a))
+
+    def test_repeat_zero(self):
+        '''r{0} sólo acepta λ, como en los otros motores'''
+        regex = Repeat(Char("a"), 0, 0)
+        assert str(derivative(regex, "a")) == "∅"
+        compiled = regex.compile("derivatives")
+        assert not compiled.match("a") and compiled.match("")
+
+    def test_finite_states(self):
+        '''Las derivadas distintas son finitas (como los estados del AFD)'''
+        ab = CharClass("ab")
+        regex = Concat(Star(ab), Char("a"), Repeat(ab, 5, 5))
+        matcher = DerivativeMatcher(regex)
+        for n in range(1, 300):
+            string = format(n * 7919, "b").replace("0", "a").replace("1", "b")
+            assert matcher.accept_string(string) == (re.fullmatch("[ab]*a[ab]{5}", string) is not None)
+        assert matcher.size() <= 2 ** 6
+
+    def test_bounded_cache(self):
+        '''Si el cache se llena, se vacía y se sigue matcheando bien'''
+        matcher = DerivativeMatcher(cases[33]["regex"], max_states=2)
+        for string in ["abcabca", "aaaccc", "abcb", "cb"]:
+            assert matcher.accept_string(string) == should_match(cases[33], string)
+        assert matcher.flushes > 0 and matcher.size() <= 2
+
+
+class TestBitParallel:
+
+    def test_auto_engine(self):
+        '''El motor auto usa bitparallel si el AFD de una expresión chica es muy grande'''
+        ab = CharClass("ab")
+        regex = Concat(Star(ab), Char("a"), Repeat(ab, 15, 15))
+        compiled = CompiledRegex.build(regex, "auto")
+        assert compiled.engine == "bitparallel"
+        for n in range(1, 300):
+            string = format(n * 7919, "b").replace("0", "a").replace("1", "b") * 2
+            assert compiled.match(string) == (re.fullmatch("[ab]*a[ab]{15}", string) is not None)
+        assert CompiledRegex.build(cases[0]["regex"], "auto").engine == "afd"
+        assert CompiledRegex.build(Concat(Star(ab), Char("a"), Repeat(ab, 70, 70)), "auto").engine == "nfa"
+
+    def test_max_states(self):
+        '''La simulación no acepta autómatas con más de 64 estados ni con transiciones λ'''
+        with pytest.raises(ValueError):
+            BitParallelNFA(Repeat(Char("a"), 64, 64).to_afnd("glushkov"))
+        with pytest.raises(ValueError):
+            BitParallelNFA(Star(Char("a")).to_afnd("thompson"))
+
+
+class TestMaxStates:
+
+    def test_fallback(self):
+        '''Si el AFD supera la cantidad máxima de estados, se simula el AFND'''
+        ab = CharClass("ab")
+        chica = Concat(Star(ab), Char("a"), Repeat(ab, 15, 15))
+        grande = Concat(Star(ab), Char("a"), Repeat(ab, 70, 70))
+        assert CompiledRegex.build(chica, "afd", max_afd_states=100).engine == "bitparallel"
+        compiled = CompiledRegex.build(grande, "afd", max_afd_states=100)
+        assert compiled.engine == "nfa"
+        assert compiled.stats() == {"engine": "nfa", "requested_engine": "afd", "max_afd_states": 100,
+                                    "afnd_states": grande.to_afnd().size(), "afd_states": None,
+                                    "fallback": True, "search_fallback": False}
+        assert compiled.match("ab" * 50 + "a" + "b" * 70) and not compiled.match("ab" * 50)
+
+    def test_search_fallback(self):
+        '''Si el AFD para buscar supera la cantidad máxima de estados, se busca simulando el AFND'''
+        regex = Concat(Char("a"), Repeat(CharClass("ab"), 15, 15))
+        compiled = CompiledRegex.build(regex, "afd", max_afd_states=100)
+        assert compiled.engine == "afd" and compiled.stats()["afd_states"] <= 100
+        string = "bb" + "ab" * 8
+        assert compiled.search(string) == 18 and compiled.search_bytes(string.encode("utf-8")) == 18
+        assert compiled.stats()["search_fallback"]
+
+    def test_compile_cache(self):
+        '''La cantidad máxima de estados es parte de la clave del cache'''
+        regex = Concat(Star(CharClass("ab")), Char("a"), Repeat(CharClass("ab"), 15, 15))
+        assert regex.compile("afd", "glushkov", 100).engine == "bitparallel"
+        assert regex.compile("afd", "glushkov").engine == "afd"
+        with pytest.raises(ValueError):
+            CompiledRegex.build(regex, "afd", max_afd_states=0)
+
+
+class TestAFND:
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_glushkov_size(self, case):
+        '''El autómata de Glushkov tiene un estado por carácter (más el inicial) y no tiene λ'''
+        afnd = case["regex"].to_afnd("glushkov")
+        assert afnd.size() == count_chars(case["regex"]) + 1
+        assert all("λ" not in afnd.transitions[q] for q in afnd.states)
+
+    @pytest.mark.parametrize("construction", CONSTRUCTIONS)
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_accept_string(self, case, strings, construction):
+        '''La simulación del AFND (sin determinizarlo) acepta las cadenas correctas'''
+        afnd = case["regex"].to_afnd(construction)
+        afnd_bytes = afnd.to_bytes()
+        for string in strings:
+            assert afnd.accept_string(string) == should_match(case, string)
+            assert afnd_bytes.accept_bytes(string.encode("utf-8")) == should_match(case, string)
+
+    def test_accept_string_exponential(self):
+        '''La simulación no depende del tamaño del AFD, y se actualiza si cambia el autómata'''
+        ab = CharClass("ab")
+        afnd = Concat(Star(ab), Char("a"), Repeat(ab, 70, 70)).to_afnd()
+        string = "ab" * 200 + "a" + "b" * 70
+        assert afnd.accept_string(string) and not afnd.accept_string(string[:-1])
+        assert afnd.search_string("xx" + string) == 73
+        afnd.add_state("extra", True)
+        afnd.add_transition(afnd.initial_state, "extra", "λ")
+        assert afnd.accept_string("")
+
+    def test_lambda_cycle_closures(self):
+        '''Los estados de un ciclo de λ comparten la clausura'''
+        afnd = AFND()
+        for q in ["q0", "q1", "q2", "q3", "q4"]:
+            afnd.add_state(q)
+        afnd.mark_initial_state("q0")
+        afnd.add_transition("q0", "q1", "λ")
+        afnd.add_transition("q1", "q2", "λ")
+        afnd.add_transition("q2", "q0", "λ")
+        afnd.add_transition("q2", "q3", "λ")
+        afnd.add_transition("q3", "q4", "a")
+        clausuras = afnd.clausuras_lambda()
+        assert clausuras["q0"] == clausuras["q1"] == clausuras["q2"] == {"q0", "q1", "q2", "q3"}
+        assert clausuras["q3"] == {"q3"} and clausuras["q4"] == {"q4"}
+
+    def test_long_lambda_chain(self):
+        '''La clausura no depende del límite de recursión'''
+        afnd = AFND()
+        n = 5000
+        for i in range(n):
+            afnd.add_state(i, i == n - 1)
+            if i > 0:
+                afnd.add_transition(i - 1, i, "λ")
+        afnd.mark_initial_state(0)
+        assert len(afnd.clausuras_lambda()[0]) == n
+        assert afnd.determinize().accept_string("")
+
+    def test_minimize_long_chain(self):
+        '''Hopcroft minimiza una cadena larga de estados sin tardar un tiempo cuadrático'''
+        afd = AFD()
+        n = 20000
+        for i in range(n):
+            afd.add_state(i, i == n - 1)
+            if i > 0:
+                afd.add_transition(i - 1, i, "a")
+        afd.mark_initial_state(0)
+        minimo = afd.minimize("hopcroft")
+        assert minimo.size() == n + 1  # Más el estado trampa
+        assert minimo.accept_string("a" * (n - 1)) and not minimo.accept_string("a" * n)
+
+    def test_char_class_fragment(self):
+        '''Un CharClass se compila a dos estados, sin transiciones λ'''
+        regex = CharClass("abcdef")
+        afnd = regex.to_afnd()
+        assert afnd.size() == 2 and "λ" not in afnd.alphabet
+        assert str(regex) == "[a-f]" and str(CharClass("_a0bc")) == "[0_a-c]"
+        assert len(afnd.determinize().alphabet) == 1
+
+    def test_determinize_max_states(self):
+        '''La determinización se corta si supera la cantidad máxima de estados'''
+        ab = CharClass("ab")
+        afnd = Concat(Star(ab), Char("a"), Repeat(ab, 8, 8)).to_afnd()
+        with pytest.raises(StateLimitExceeded) as error:
+            afnd.determinize(max_states=100)
+        assert error.value.limit == 100
+        assert afnd.determinize(max_states=2 ** 10).minimize().size() == 2 ** 9
+
+    def test_repeat_linear_size(self):
+        '''El AFND de exp{n,m} tiene tamaño lineal en m'''
+        regex = Repeat(Char("a"), 1, 100)
+        assert regex.to_afnd().size() == 2 * 100 + 2
+        assert regex.to_afnd("glushkov").size() == 100 + 1
+        assert regex.naive_match("a" * 100) and not regex.naive_match("a" * 101)
+        assert regex.compile().match("a" * 57) and not regex.compile().match("")
+        assert Repeat(Char("a"), 0, 0).compile().match("")
+
+    def test_alphabet_classes(self):
+        '''Los símbolos que el autómata no distingue se determinizan como uno solo'''
+        afnd = AFND()
+        for q in range(3):
+            afnd.add_state(q, q == 2)
+        afnd.mark_initial_state(0)
+        for a in "abcñ":
+            afnd.add_transition(0, 1, a)
+            afnd.add_transition(1, 2, a)
+        afnd.add_transition(1, 2, "d")
+        clases = afnd.alphabet_classes()
+        assert clases["a"] == clases["b"] == clases["c"] == clases["ñ"] != clases["d"]
+
+        afd = afnd.determinize().minimize()
+        assert len(afd.alphabet) == 2
+        tabla, tabla_bytes = TablaAFD(afd), TablaAFD(afd.to_bytes())
+        for string in ["ab", "cd", "ñc", "dd", "a", "ae", "bañ"]:
+            expected = re.fullmatch("[abcñ][abcdñ]", string) is not None
+            assert afd.accept_string(string) == tabla.accept_string(string) == expected
+            assert tabla_bytes.accept_bytes(string.encode("utf-8")) == expected
+
+
+class TestTablaAFD:
+
+    def test_dead_state_stops_early(self):
+        '''Al entrar al estado muerto se deja de leer la entrada'''
+        tabla = TablaAFD(cases[0]["regex"].to_afnd().determinize().minimize())
+
+        def entrada():
+            yield "x"
+            raise AssertionError("Se siguió leyendo después del estado muerto")
+
+        assert tabla.accept_string(entrada()) is False
+
+    def test_search_unknown_chars(self):
+        '''Al buscar, un carácter desconocido corta la ocurrencia empezada'''
+        afnd = AFND()
+        for q in range(3):
+            afnd.add_state(q, q == 2)
+        afnd.mark_initial_state(0)
+        afnd.add_transition(0, 1, "a")
+        afnd.add_transition(1, 2, "b")
+        tabla = TablaAFD(afnd.unanchored().determinize().minimize(), search=True)
+        assert tabla.search_string("axbab") == 5
+        assert tabla.search_string("axb") is None
+        with pytest.raises(ValueError):
+            TablaAFD(afnd.determinize().minimize()).search_string("ab")
+
+    def test_universal_state(self):
+        '''Si desde un estado se acepta todo, se deja de leer la entrada'''
+        afd = AFD()
+        for q in ["q0", "q1", "q2"]:
+            afd.add_state(q, q == "q1")
+        afd.mark_initial_state("q0")
+        for b in range(256):
+            afd.add_transition("q0", "q1" if b == ord("a") else "q2", b)
+            afd.add_transition("q1", "q1", b)
+            afd.add_transition("q2", "q2", b)
+        tabla = TablaAFD(afd)
+        assert tabla.size() == 1
+        assert tabla.accept_bytes(b"a" + bytes(range(256)))
+        assert not tabla.accept_bytes(b"ba")
+        assert not tabla.accept_bytes(b"")
@@ -0,0 +1,123 @@
+from io import BytesIO, StringIO
+import importlib
+
+from regex import Char, CharClass, Concat, Prefilter, PrefilterStats, Repeat
+from scan import OutputBuffer, matching_lines, scan_mmap, split_file, scan_parallel
+
+regex = importlib.import_module("tests.regexes.r29").__regex__
+lines = [b"abcd", b"e", b"", b"x", "ñ".encode("utf-8"), b"aad", b"f"] * 50
+
+
+def write_input(tmp_path, final_newline=True):
+    path = tmp_path / "input.txt"
+    path.write_bytes(b"\n".join(lines) + (b"\n" if final_newline else b""))
+    return str(path)
+
+
+class TestScan:
+
+    def test_matching_lines(self):
+        '''Se encuentran las líneas que matchean, con su salto de línea'''
+        data = b"abcd\nx\nf"
+        found = [data[i:j] for i, j in matching_lines(data, regex.compile().match_bytes)]
+        assert found == [b"abcd\n", b"f"]
+
+    def test_matching_lines_prefilter(self):
+        '''Las líneas sin el literal se descartan sin llegar a match_bytes'''
+        data = b"abd\nxd\ncd"
+        prefilter = Prefilter("d")
+        assert list(matching_lines(data, lambda line: bytes(line) == b"abd", prefilter)) == [(0, 4)]
+        assert list(matching_lines(data, lambda line: False, Prefilter("b"))) == []
+        stats = PrefilterStats("b")
+        list(matching_lines(data, lambda line: True, Prefilter("b"), stats))
+        assert stats.stats() == {"literal": "b", "checked": 3, "rejected": 2}
+
+    def test_split_file(self, tmp_path):
+        '''Los rangos cubren el archivo y se cortan en saltos de línea'''
+        path = write_input(tmp_path)
+        data = open(path, "rb").read()
+        chunks = split_file(path, 7)
+        assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+        for (_, fin), (inicio, _) in zip(chunks, chunks[1:]):
+            assert fin == inicio and data[fin - 1:fin] == b"\n"
+
+    def test_scan_parallel(self, tmp_path):
+        '''En paralelo se imprimen las mismas líneas, en el mismo orden'''
+        for final_newline in [True, False]:
+            path = write_input(tmp_path, final_newline)
+            output = BytesIO()
+            scan_parallel(path, regex.compile(), 3, output)
+            expected = b"".join(line + b"\n" for line in lines if regex.match(line.decode("utf-8")))
+            if not final_newline and regex.match(lines[-1].decode("utf-8")):
+                expected = expected[:-1]
+            assert output.getvalue() == expected
+
+    def test_scan_mmap(self, tmp_path):
+        '''Con mmap se imprimen las mismas líneas que leyendo el archivo'''
+        path = write_input(tmp_path)
+        output = BytesIO()
+        scan_mmap(path, regex.compile(), output)
+        assert output.getvalue() == b"".join(line + b"\n" for line in lines if regex.match(line.decode("utf-8")))
+
+    def test_scan_mmap_empty_file(self, tmp_path):
+        '''Un archivo vacío no imprime nada'''
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        output = BytesIO()
+        scan_mmap(str(path), regex.compile(), output)
+        assert output.getvalue() == b""
+
+    def test_scan_mmap_buffered(self, tmp_path):
+        '''Las líneas guardadas en un OutputBuffer se escriben antes de cerrar el mmap'''
+        path = write_input(tmp_path)
+        output = BytesIO()
+        with OutputBuffer(output, size=1 << 20) as buffered:
+            scan_mmap(path, regex.compile(), buffered)
+        assert output.getvalue() == b"".join(line + b"\n" for line in lines if regex.match(line.decode("utf-8")))
+
+    def test_output_buffer(self):
+        '''El buffer escribe de a bloques, salvo con line_buffered'''
+        output = StringIO()
+        buffered = OutputBuffer(output, size=10)
+        buffered.write("abcd\n")
+        assert output.getvalue() == ""
+        buffered.write("efghi\n")
+        assert output.getvalue() == "abcd\nefghi\n"
+        buffered.write("j\n")
+        buffered.flush()
+        assert output.getvalue() == "abcd\nefghi\nj\n"
+
+        output = BytesIO()
+        buffered = OutputBuffer(output, size=10, line_buffered=True)
+        buffered.write(b"abcd\n")
+        assert output.getvalue() == b"abcd\n"
+
+    def test_scan_search(self, tmp_path):
+        '''Con search se imprimen las líneas en las que aparece la expresión'''
+        path = write_input(tmp_path)
+        compiled = regex.compile()
+        expected = b"".join(line + b"\n" for line in lines if compiled.search(line.decode("utf-8")) is not None)
+        for scan in [lambda output: scan_mmap(path, compiled, output, search=True),
+                     lambda output: scan_parallel(path, compiled, 3, output, search=True)]:
+            output = BytesIO()
+            scan(output)
+            assert output.getvalue() == expected
+
+    def test_scan_parallel_prepares_search(self, tmp_path):
+        '''Los motores para buscar se arman antes de repartir el trabajo, aunque haya un literal obligatorio'''
+        path = write_input(tmp_path)
+        compiled = Concat(Char("x"), Char("a"), Repeat(CharClass("ab"), 15, 15)).compile()
+        assert compiled.prefilter is not None
+        scan_parallel(path, compiled, 2, BytesIO(), search=True)
+        assert compiled._motor_search is not None
+
+    def test_scan_prefilter_stats(self, tmp_path):
+        '''Las líneas descartadas por el prefiltro se cuentan por recorrido, también en paralelo'''
+        path = write_input(tmp_path)
+        compiled = Concat(Char("a"), Char("d")).compile()
+        descartadas = sum(1 for line in lines if b"ad" not in line)
+        for scan in [lambda stats: scan_mmap(path, compiled, BytesIO(), stats=stats),
+                     lambda stats: scan_parallel(path, compiled, 3, BytesIO(), stats=stats)]:
+            stats = PrefilterStats("ad")
+            scan(stats)
+            assert (stats.checked, stats.rejected) == (len(lines), descartadas)
@@ -0,0 +1,41 @@
+import pytest
+
+from regex import Empty, Lambda, Char, CharClass, Union, Concat, Star, Plus, Repeat
+from regex.simplify import char_class, union, concat, star, plus, optional, repeat
+
+a, b, c = Char("a"), Char("b"), Char("c")
+
+cases = [
+    {"name": "union_flatten", "exp": union(union(concat(a, b), c), concat(b, a)), "expected": Union(Concat(a, b), c, Concat(b, a))},
+    {"name": "union_empty", "exp": union(Empty(), concat(a, b)), "expected": Concat(a, b)},
+    {"name": "union_duplicates", "exp": union(concat(a, b), concat(a, b)), "expected": Concat(a, b)},
+    {"name": "union_chars", "exp": union(a, CharClass("bc"), Star(a), b), "expected": Union(CharClass("abc"), Star(a))},
+    {"name": "union_all_empty", "exp": union(Empty(), Empty()), "expected": Empty()},
+    {"name": "concat_flatten", "exp": concat(concat(a, b), concat(Lambda(), c)), "expected": Concat(a, b, c)},
+    {"name": "concat_lambda", "exp": concat(Lambda(), a), "expected": a},
+    {"name": "concat_empty", "exp": concat(a, Empty(), b), "expected": Empty()},
+    {"name": "star_star", "exp": star(star(a)), "expected": Star(a)},
+    {"name": "star_plus", "exp": star(plus(a)), "expected": Star(a)},
+    {"name": "star_optional", "exp": star(optional(concat(a, b))), "expected": Star(Concat(a, b))},
+    {"name": "star_lambda", "exp": star(Lambda()), "expected": Lambda()},
+    {"name": "plus_plus", "exp": plus(plus(a)), "expected": Plus(a)},
+    {"name": "plus_union", "exp": plus(union(concat(a, b), c)), "expected": Plus(Union(Concat(a, b), c))},
+    {"name": "plus_repeat_optional", "exp": plus(repeat(concat(a, b), 0, 1)), "expected": Star(Concat(a, b))},
+    {"name": "plus_optional", "exp": plus(optional(concat(a, b))), "expected": Star(Concat(a, b))},
+    {"name": "optional_star", "exp": optional(star(a)), "expected": Star(a)},
+    {"name": "optional_plus", "exp": optional(plus(a)), "expected": Star(a)},
+    {"name": "repeat_zero", "exp": repeat(a, 0, 0), "expected": Lambda()},
+    {"name": "repeat_one", "exp": repeat(a, 1, 1), "expected": a},
+    {"name": "repeat_empty", "exp": repeat(Empty(), 0, 2), "expected": Lambda()},
+    {"name": "repeat", "exp": repeat(a, 2, 3), "expected": Repeat(a, 2, 3)},
+    {"name": "char_class_empty", "exp": char_class(""), "expected": Empty()},
+    {"name": "char_class_single", "exp": char_class("a"), "expected": a},
+]
+
+
+@pytest.mark.parametrize("case", cases, ids=lambda case: case["name"])
+class TestSimplify:
+
+    def test_simplified(self, case):
+        '''El constructor devuelve la expresión simplificada'''
+        assert case["exp"]._key() == case["expected"]._key(), f"Se esperaba {case['expected']} pero se obtuvo {case['exp']}"
@@ -5,14 +5,57 @@ import importlib
 import time
 
 from parse_regex import parse_regex, SyntaxError
+from regex import CONSTRUCTIONS, ENGINES, PrefilterStats
+from scan import OutputBuffer, scan_mmap, scan_parallel
 
 usage = "%prog [regex] [file]"
 
+
+def new_prefilter_stats(compiled):
+    """Devuelve la cuenta de las líneas que descarta el prefiltro de la expresión compilada (si tiene uno)."""
+    if compiled.prefilter is None:
+        return None
+    return PrefilterStats(compiled.prefilter.literal)
+
+
+def print_prefilter_stats(prefilter_stats):
+    """Imprime cuántas líneas descartó el prefiltro sin correr el autómata (si hubo uno)."""
+    if prefilter_stats is not None and prefilter_stats.checked > 0:
+        stats = prefilter_stats.stats()
+        print(f"prefiltro {stats['literal']!r}: {stats['rejected']} de {stats['checked']} líneas descartadas")
+
+
+def print_engine_stats(compiled):
+    """Imprime qué motor se usó en vez del AFD, si la determinización superó la cantidad máxima de estados."""
+    stats = compiled.stats()
+    if stats["fallback"]:
+        print(f"motor {stats['requested_engine']}: el AFD supera los {stats['max_afd_states']} estados, "
+              f"se usó {stats['engine']} (AFND de {stats['afnd_states']} estados)")
+    elif stats["search_fallback"]:
+        print(f"motor {stats['engine']}: el AFD para buscar supera los {stats['max_afd_states']} estados, "
+              f"se usó nfa (AFND de {stats['afnd_states']} estados)")
+
+
 opt_parser = optparse.OptionParser(usage=usage)
 opt_parser.add_option("-m", "--module", dest="module", action="store_true",
                       help="read the regular expression from a Python module")
 opt_parser.add_option("-n", "--naive", dest="naive", action="store_true",
                       help="use the naive implementation to match against the regular expression")
+opt_parser.add_option("-e", "--engine", dest="engine", type="choice", choices=ENGINES, default="afd",
+                      help=f"engine used to compile the regular expression ({', '.join(ENGINES)}) [default: %default]")
+opt_parser.add_option("-c", "--construction", dest="construction", type="choice", choices=CONSTRUCTIONS,
+                      default="thompson",
+                      help=f"construction used to build the NFA ({', '.join(CONSTRUCTIONS)}) [default: %default]")
+opt_parser.add_option("--max-states", dest="max_states", type="int",
+                      help="maximum number of DFA states; if the DFA needs more, the NFA is simulated instead")
+opt_parser.add_option("-b", "--bytes", dest="bytes", action="store_true",
+                      help="match raw UTF-8 bytes, without decoding the input lines")
+opt_parser.add_option("-j", "--jobs", dest="jobs", type="int", default=1,
+                      help="number of processes used to scan the file (implies --bytes) [default: %default]")
+opt_parser.add_option("-s", "--search", dest="search", action="store_true",
+                      help="print the lines that contain a match, instead of the lines that match entirely")
+opt_parser.add_option("--line-buffered", dest="line_buffered", action="store_true",
+                      help="write each matching line as soon as it is found, instead of in blocks")
 opts, args = opt_parser.parse_args()
 
 if len(args) < 1:
@@ -21,6 +64,15 @@ if len(args) < 1:
 elif len(args) > 2:
     print("ERROR: Too many arguments", file=sys.stderr)
     exit(1)
+elif opts.naive and (opts.bytes or opts.jobs > 1 or opts.search):
+    print("ERROR: --naive can't be used together with --bytes, --jobs or --search", file=sys.stderr)
+    exit(1)
+elif opts.max_states is not None and opts.max_states < 1:
+    print("ERROR: --max-states needs a positive number of states", file=sys.stderr)
+    exit(1)
+elif opts.jobs < 1 or (opts.jobs > 1 and len(args) < 2):
+    print("ERROR: --jobs needs a positive number of processes and an input file", file=sys.stderr)
+    exit(1)
 else:
     regex_arg = args[0]
     if opts.module:
@@ -34,17 +86,76 @@ else:
             print(f"Syntax error: {e}", file=sys.stderr)
             exit(1)
 
-    with open(args[1]) if len(args) == 2 else sys.stdin as input_file:
+    if opts.jobs > 1:
+        # Compilamos una sola vez y mandamos la expresión compilada a los procesos
+        start_time = time.time()
+        compiled = regex.compile(opts.engine, opts.construction, opts.max_states)
+        prefilter_stats = new_prefilter_stats(compiled)
+        sys.stdout.flush()
+        with OutputBuffer(sys.stdout.buffer, line_buffered=opts.line_buffered) as output:
+            scan_parallel(args[1], compiled, opts.jobs, output, opts.search, prefilter_stats)
+        print_engine_stats(compiled)
+        print_prefilter_stats(prefilter_stats)
+        print("%s segundos" % (time.time() - start_time))
+        exit(0)
+
+    if opts.bytes and len(args) == 2:
+        # Con un archivo, lo mapeamos en memoria en vez de leerlo de a líneas
+        start_time = time.time()
+        compiled = regex.compile(opts.engine, opts.construction, opts.max_states)
+        prefilter_stats = new_prefilter_stats(compiled)
+        sys.stdout.flush()
+        with OutputBuffer(sys.stdout.buffer, line_buffered=opts.line_buffered) as output:
+            scan_mmap(args[1], compiled, output, opts.search, prefilter_stats)
+        print_engine_stats(compiled)
+        print_prefilter_stats(prefilter_stats)
+        print("%s segundos" % (time.time() - start_time))
+        exit(0)
+
+    if opts.bytes:
+        input_file = open(args[1], "rb") if len(args) == 2 else sys.stdin.buffer
+    else:
+        input_file = open(args[1]) if len(args) == 2 else sys.stdin
+
+    with input_file:
 
         start_time = time.time()
+        compiled = None if opts.naive else regex.compile(opts.engine, opts.construction, opts.max_states)
+        prefilter_stats = None if opts.naive else new_prefilter_stats(compiled)
+
+        if opts.bytes:
+            # Escribimos directo los bytes de las líneas, sin pasar por str.
+            # El prefiltro de la expresión compilada cuenta las líneas descartadas.
+            if opts.search:
+                search_bytes = compiled.search_bytes
+                match_bytes = lambda line, end: search_bytes(line, end, prefilter_stats) is not None
+            else:
+                match_bytes = lambda line, end: compiled.match_bytes(line, end, prefilter_stats)
+            sys.stdout.flush()
+
+            with OutputBuffer(sys.stdout.buffer, line_buffered=opts.line_buffered) as output:
+                for line in input_file:
+                    end = len(line) - 1 if line.endswith(b"\n") else None
+                    if match_bytes(line, end):
+                        output.write(line)
 
-        for line in input_file:
+        else:
+            # Elegimos la implementación una sola vez, fuera del loop
             if opts.naive:
-                matched = regex.naive_match(line.strip("\n"))
+                match = regex.naive_match
+            elif opts.search:
+                search = compiled.search
+                match = lambda line: search(line, prefilter_stats) is not None
             else:
-                matched = regex.match(line.strip("\n"))
+                match = lambda line: compiled.match(line, prefilter_stats)
 
-            if matched:
-                print(line, end="")
+            # Juntamos las líneas que matchean y las imprimimos de a bloques
+            with OutputBuffer(sys.stdout, line_buffered=opts.line_buffered) as output:
+                for line in input_file:
+                    if match(line.strip("\n")):
+                        output.write(line)
 
+        if not opts.naive:
+            print_engine_stats(compiled)
+            print_prefilter_stats(prefilter_stats)
         print("%s segundos" % (time.time() - start_time))